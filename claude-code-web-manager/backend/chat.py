@@ -1,22 +1,40 @@
 import asyncio
-import json
 import os
 import shutil
 from typing import Callable, Awaitable, Optional
 
+import orjson
+
+from backend.executor import KILL_TIMEOUT, STREAM_LIMIT, read_line, read_tail
+
 
 class ChatSession:
     """Manages an interactive Claude Code chat session.
 
     Each session maintains conversation continuity via --resume <session_id>.
     Messages are sent one at a time; each spawns a new claude subprocess.
+
+    The on_* callbacks are awaited once per streamed event, so they should
+    return without blocking whenever there is no backpressure.
     """
 
+    # Resolved path of the claude CLI, shared by all sessions.  Only a
+    # successful lookup is cached so installing claude later still works.
+    _claude_path: Optional[str] = None
+
     def __init__(self, working_dir: str):
         self.working_dir = working_dir
         self.session_id: Optional[str] = None
         self.process: Optional[asyncio.subprocess.Process] = None
         self.is_processing = False
+        # The environment rarely changes between messages; build it once
+        self._env = self._build_env()
+
+    @classmethod
+    def _resolve_claude(cls) -> Optional[str]:
+        if cls._claude_path is None:
+            cls._claude_path = shutil.which("claude")
+        return cls._claude_path
 
     def _build_env(self) -> dict[str, str]:
         env = {**os.environ, "CLAUDE_CODE_DISABLE_NONESSENTIAL_TRAFFIC": "1"}
@@ -36,7 +54,7 @@ class ChatSession:
             await on_error("A message is already being processed")
             return
 
-        claude_path = shutil.which("claude")
+        claude_path = self._resolve_claude()
         if not claude_path:
             await on_error("claude CLI not found in PATH")
             return
@@ -53,42 +71,35 @@ class ChatSession:
         if self.session_id:
             cmd.extend(["--resume", self.session_id])
 
+        stderr_task: Optional[asyncio.Task] = None
         try:
             self.process = await asyncio.create_subprocess_exec(
                 *cmd,
                 cwd=self.working_dir,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
-                env=self._build_env(),
+                env=self._env,
+                limit=STREAM_LIMIT,
             )
+            # Drain stderr concurrently so a full stderr pipe can't block claude;
+            # only the tail is kept for the error message.
+            stderr_task = asyncio.create_task(read_tail(self.process.stderr))
 
             parsed: dict = {}
-            buf = b""
-
-            while True:
-                chunk = await self.process.stdout.read(65536)
-                if not chunk:
-                    break
-                buf += chunk
-                while b"\n" in buf:
-                    raw_line, buf = buf.split(b"\n", 1)
-                    decoded = raw_line.decode().rstrip()
-                    if not decoded:
-                        continue
-                    await self._process_line(
-                        decoded, on_text, on_tool, on_session_info, parsed,
-                    )
-
-            # Flush trailing data
-            if buf.strip():
-                decoded = buf.decode().rstrip()
+
+            # read_line() reassembles lines longer than STREAM_LIMIT, which
+            # plain StreamReader iteration would reject with ValueError.
+            while raw_line := await read_line(self.process.stdout):
+                raw_line = raw_line.rstrip()
+                if not raw_line:
+                    continue
                 await self._process_line(
-                    decoded, on_text, on_tool, on_session_info, parsed,
+                    raw_line, on_text, on_tool, on_session_info, parsed,
                 )
 
+            stderr_bytes = await stderr_task
             await self.process.wait()
-            stderr_bytes = await self.process.stderr.read()
-            stderr = stderr_bytes.decode()
+            stderr = stderr_bytes.decode(errors="replace")
 
             exit_code = self.process.returncode
 
@@ -111,25 +122,31 @@ class ChatSession:
 
         except asyncio.CancelledError:
             self.is_processing = False
+            if stderr_task is not None:
+                stderr_task.cancel()
             await self._kill_process()
             raise
         except Exception as e:
             self.is_processing = False
-            self.process = None
+            if stderr_task is not None:
+                stderr_task.cancel()
+            # Don't leave claude running unattended after a read error
+            await self._kill_process()
             await on_error(str(e))
 
     async def _process_line(
         self,
-        decoded: str,
+        raw_line: bytes,
         on_text: Callable[[str], Awaitable[None]],
         on_tool: Callable[[str], Awaitable[None]],
         on_session_info: Callable[[str], Awaitable[None]],
         parsed: dict,
     ) -> None:
+        # orjson parses bytes directly; only decode for the plain-text fallback
         try:
-            event = json.loads(decoded)
-        except json.JSONDecodeError:
-            await on_text(decoded)
+            event = orjson.loads(raw_line)
+        except orjson.JSONDecodeError:
+            await on_text(raw_line.decode(errors="replace"))
             return
 
         event_type = event.get("type")
@@ -168,12 +185,23 @@ class ChatSession:
         await self._kill_process()
 
     async def _kill_process(self) -> None:
-        if self.process:
+        """Terminate claude and reap it, escalating to SIGKILL if it hangs."""
+        proc = self.process
+        if proc is None:
+            return
+        self.process = None
+        try:
+            proc.terminate()
+        except ProcessLookupError:
+            return
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=KILL_TIMEOUT)
+        except asyncio.TimeoutError:
             try:
-                self.process.terminate()
+                proc.kill()
             except ProcessLookupError:
-                pass
-            self.process = None
+                return
+            await proc.wait()
 
     async def cleanup(self) -> None:
         await self._kill_process()
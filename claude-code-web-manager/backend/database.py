@@ -1,7 +1,11 @@
+import asyncio
 import aiosqlite
-import json
+import orjson
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional
+from enum import Enum
+from functools import lru_cache
+from typing import AsyncIterator, Optional, Sequence
 from pathlib import Path
 
 from backend.models import Task, TaskStatus, TaskMode, TaskPriority, TaskLog, TaskPlan
@@ -14,6 +18,14 @@ PRIORITY_ORDER = {
     "low": 1,
 }
 
+# SQL expression mapping the priority string to its PRIORITY_ORDER rank.
+# Stored as a generated column so the dispatch query can ORDER BY an index.
+PRIORITY_RANK_SQL = (
+    "CASE priority "
+    + " ".join(f"WHEN '{name}' THEN {rank}" for name, rank in PRIORITY_ORDER.items())
+    + " ELSE 0 END"
+)
+
 SCHEMA_SQL = """
 CREATE TABLE IF NOT EXISTS tasks (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -38,7 +50,8 @@ CREATE TABLE IF NOT EXISTS tasks (
     created_by TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     started_at TIMESTAMP,
-    completed_at TIMESTAMP
+    completed_at TIMESTAMP,
+    priority_rank INTEGER GENERATED ALWAYS AS (PRIORITY_RANK_SQL) VIRTUAL
 );
 
 CREATE TABLE IF NOT EXISTS task_logs (
@@ -60,17 +73,111 @@ CREATE TABLE IF NOT EXISTS task_plans (
 );
 
 CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
-CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority, created_at);
 CREATE INDEX IF NOT EXISTS idx_task_logs_task_id ON task_logs(task_id);
 CREATE INDEX IF NOT EXISTS idx_task_plans_task_id ON task_plans(task_id);
+""".replace("PRIORITY_RANK_SQL", PRIORITY_RANK_SQL)
+
+# Created after migrations, since older databases lack priority_rank until then
+DISPATCH_INDEX_SQL = """
+DROP INDEX IF EXISTS idx_tasks_priority;
+CREATE INDEX IF NOT EXISTS idx_tasks_dispatch
+    ON tasks(status, priority_rank DESC, created_at ASC);
 """
 
+# Connection tuning applied on init.  WAL lets readers proceed alongside the
+# single writer; synchronous=NORMAL is durable in WAL mode without an fsync
+# per commit; busy_timeout retries instead of failing fast with SQLITE_BUSY.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -64000",
+    "PRAGMA busy_timeout = 5000",
+)
+
+# Read-only connections share the writer's tuning except the journal mode,
+# which is a property of the database file and set by the writer.
+READER_PRAGMAS = (
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -64000",
+    "PRAGMA busy_timeout = 5000",
+)
+
+# Number of read-only connections kept open alongside the single writer.
+READ_POOL_SIZE = 4
+
+# Per-connection LRU of prepared statements kept by the sqlite3 module, keyed
+# by SQL text.  Sized so the hot lookups and the update_task shapes in use
+# all stay compiled instead of being re-prepared on every call.
+STATEMENT_CACHE_SIZE = 256
+
+
+_TASK_FIELDS = frozenset(Task.model_fields)
+_TIMESTAMP_FIELDS = ("created_at", "started_at", "completed_at")
+_ENUM_FIELDS = (("status", TaskStatus), ("mode", TaskMode), ("priority", TaskPriority))
+
+
+def _parse_timestamp(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
 
 def _row_to_task(row: aiosqlite.Row) -> Task:
-    d = dict(row)
-    d["depends_on"] = json.loads(d.get("depends_on") or "[]")
-    d["tags"] = json.loads(d.get("tags") or "[]")
-    return Task(**d)
+    # Rows come from our own schema, so skip pydantic validation and do the
+    # few conversions callers rely on (enums, datetimes, JSON lists) by hand.
+    d = {k: row[k] for k in row.keys() if k in _TASK_FIELDS}
+    for key, enum in _ENUM_FIELDS:
+        if d.get(key) is not None:
+            d[key] = enum(d[key])
+    for key in _TIMESTAMP_FIELDS:
+        if key in d:
+            d[key] = _parse_timestamp(d[key])
+    d["depends_on"] = orjson.loads(d.get("depends_on") or "[]")
+    d["tags"] = orjson.loads(d.get("tags") or "[]")
+    return Task.model_construct(**d)
+
+
+def _encode_json_list(value):
+    return orjson.dumps(value).decode() if isinstance(value, list) else value
+
+
+def _enum_value(value):
+    return value.value if isinstance(value, Enum) else value
+
+
+# update_task field → conversion to its SQLite representation.  Fields not
+# listed here are stored as-is.
+_FIELD_CONVERTERS = {
+    "depends_on": _encode_json_list,
+    "tags": _encode_json_list,
+    "status": _enum_value,
+    "mode": _enum_value,
+    "priority": _enum_value,
+}
+
+
+@lru_cache(maxsize=64)
+def _update_sql(columns: tuple[str, ...]) -> str:
+    """UPDATE statement for a given set of columns, built once per shape."""
+    set_clause = ", ".join(f"{k} = ?" for k in columns)
+    return f"UPDATE tasks SET {set_clause} WHERE id = ?"
+
+
+# Rows per multi-row INSERT in create_tasks_bulk: 8 parameters each keeps a
+# statement under SQLite's historical 999-variable limit.
+BULK_INSERT_ROWS = 100
+
+_TASK_INSERT_COLUMNS = "title, prompt, mode, priority, depends_on, repo_path, tags, created_by"
+
+
+@lru_cache(maxsize=8)
+def _bulk_insert_sql(n_rows: int) -> str:
+    """Multi-row INSERT ... RETURNING for n_rows tasks, built once per size."""
+    values = ", ".join(["(?, ?, ?, ?, ?, ?, ?, ?)"] * n_rows)
+    return f"INSERT INTO tasks ({_TASK_INSERT_COLUMNS}) VALUES {values} RETURNING *"
 
 
 def _row_to_log(row: aiosqlite.Row) -> TaskLog:
@@ -78,17 +185,61 @@ def _row_to_log(row: aiosqlite.Row) -> TaskLog:
 
 
 class Database:
-    def __init__(self, db_path: str = "tasks.db"):
+    """SQLite access layer.
+
+    All writes go through one read-write connection (``_conn``).  Reads are
+    served from a small pool of read-only connections, which WAL mode lets
+    run concurrently with the writer.  In-memory databases cannot be shared
+    across connections, so their reads fall back to the writer.
+    """
+
+    def __init__(self, db_path: str = "tasks.db", read_pool_size: int = READ_POOL_SIZE):
         self.db_path = db_path
+        self.read_pool_size = read_pool_size
         self._conn: Optional[aiosqlite.Connection] = None
+        self._readers: Optional[asyncio.Queue[aiosqlite.Connection]] = None
+        self._reader_conns: list[aiosqlite.Connection] = []
 
     async def init(self):
-        self._conn = await aiosqlite.connect(self.db_path)
+        self._conn = await aiosqlite.connect(
+            self.db_path, cached_statements=STATEMENT_CACHE_SIZE,
+        )
         self._conn.row_factory = aiosqlite.Row
         await self._conn.executescript(SCHEMA_SQL)
         await self._conn.execute("PRAGMA foreign_keys = ON")
+        for pragma in CONNECTION_PRAGMAS:
+            await self._conn.execute(pragma)
         await self._conn.commit()
         await self._migrate_schema()
+        await self._open_readers()
+
+    async def _open_readers(self) -> None:
+        """Open the read-only connection pool (no-op if already open)."""
+        if self._reader_conns or self.read_pool_size <= 0 or self.db_path == ":memory:":
+            return
+        uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+        self._readers = asyncio.Queue()
+        for _ in range(self.read_pool_size):
+            conn = await aiosqlite.connect(
+                uri, uri=True, cached_statements=STATEMENT_CACHE_SIZE,
+            )
+            conn.row_factory = aiosqlite.Row
+            for pragma in READER_PRAGMAS:
+                await conn.execute(pragma)
+            self._reader_conns.append(conn)
+            self._readers.put_nowait(conn)
+
+    @asynccontextmanager
+    async def _acquire_reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read-only connection, returning it to the pool on exit."""
+        if self._readers is None:
+            yield self._conn
+            return
+        conn = await self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put_nowait(conn)
 
     async def _migrate_schema(self):
         """Add columns that may be missing from older databases."""
@@ -97,8 +248,21 @@ class Database:
             await self._conn.commit()
         except Exception:
             pass  # Column already exists
+        try:
+            await self._conn.execute(
+                "ALTER TABLE tasks ADD COLUMN priority_rank INTEGER "
+                f"GENERATED ALWAYS AS ({PRIORITY_RANK_SQL}) VIRTUAL"
+            )
+            await self._conn.commit()
+        except Exception:
+            pass  # Column already exists
+        await self._conn.executescript(DISPATCH_INDEX_SQL)
 
     async def close(self):
+        for conn in self._reader_conns:
+            await conn.close()
+        self._reader_conns = []
+        self._readers = None
         if self._conn:
             await self._conn.close()
             self._conn = None
@@ -118,93 +282,145 @@ class Database:
             """
             INSERT INTO tasks (title, prompt, mode, priority, depends_on, repo_path, tags, created_by)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            RETURNING *
             """,
             (
                 title,
                 prompt,
                 mode,
                 priority,
-                json.dumps(depends_on),
+                orjson.dumps(depends_on).decode(),
                 repo_path,
-                json.dumps(tags),
+                orjson.dumps(tags).decode(),
                 created_by,
             ),
         ) as cursor:
-            task_id = cursor.lastrowid
+            row = await cursor.fetchone()
         await self._conn.commit()
-        return await self.get_task(task_id)
+        return _row_to_task(row)
+
+    async def create_tasks_bulk(self, tasks: list[dict]) -> list[Task]:
+        """Insert several tasks with multi-row INSERTs and a single commit.
+
+        Each dict takes create_task's keyword arguments.  Tasks are returned
+        in input order; either all of them are created or none are.
+        """
+        if not tasks:
+            return []
+        params = [
+            (
+                t["title"],
+                t["prompt"],
+                t.get("mode", "execute"),
+                t.get("priority", "medium"),
+                orjson.dumps(t.get("depends_on", [])).decode(),
+                t.get("repo_path"),
+                orjson.dumps(t.get("tags", [])).decode(),
+                t.get("created_by"),
+            )
+            for t in tasks
+        ]
+        rows = []
+        try:
+            for i in range(0, len(params), BULK_INSERT_ROWS):
+                chunk = params[i:i + BULK_INSERT_ROWS]
+                async with self._conn.execute(
+                    _bulk_insert_sql(len(chunk)), [v for row in chunk for v in row]
+                ) as cursor:
+                    rows.extend(await cursor.fetchall())
+            await self._conn.commit()
+        except Exception:
+            await self._conn.rollback()
+            raise
+        # RETURNING order is unspecified; ids follow insertion order
+        rows.sort(key=lambda r: r["id"])
+        return [_row_to_task(r) for r in rows]
 
     async def get_task(self, task_id: int) -> Optional[Task]:
-        async with self._conn.execute(
-            "SELECT * FROM tasks WHERE id = ?", (task_id,)
-        ) as cursor:
-            row = await cursor.fetchone()
+        async with self._acquire_reader() as conn:
+            async with conn.execute(
+                "SELECT * FROM tasks WHERE id = ?", (task_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
         if row is None:
             return None
         return _row_to_task(row)
 
     async def list_tasks(self, status: Optional[TaskStatus] = None) -> list[Task]:
-        if status is not None:
-            async with self._conn.execute(
-                "SELECT * FROM tasks WHERE status = ? ORDER BY created_at ASC",
-                (status.value,),
-            ) as cursor:
-                rows = await cursor.fetchall()
-        else:
-            async with self._conn.execute(
-                "SELECT * FROM tasks ORDER BY created_at ASC"
-            ) as cursor:
-                rows = await cursor.fetchall()
+        async with self._acquire_reader() as conn:
+            if status is not None:
+                async with conn.execute(
+                    "SELECT * FROM tasks WHERE status = ? ORDER BY created_at ASC",
+                    (status.value,),
+                ) as cursor:
+                    rows = await cursor.fetchall()
+            else:
+                async with conn.execute(
+                    "SELECT * FROM tasks ORDER BY created_at ASC"
+                ) as cursor:
+                    rows = await cursor.fetchall()
         return [_row_to_task(r) for r in rows]
 
     async def update_task(self, task_id: int, **fields) -> None:
         if not fields:
             return
-        # Serialize special fields
-        for key in ("depends_on", "tags"):
-            if key in fields and isinstance(fields[key], list):
-                fields[key] = json.dumps(fields[key])
-        # Convert enums to their values
+        values = []
         for key, val in fields.items():
-            if isinstance(val, (TaskStatus, TaskMode, TaskPriority)):
-                fields[key] = val.value
-        set_clause = ", ".join(f"{k} = ?" for k in fields)
-        values = list(fields.values()) + [task_id]
-        await self._conn.execute(
-            f"UPDATE tasks SET {set_clause} WHERE id = ?", values
-        )
+            convert = _FIELD_CONVERTERS.get(key)
+            values.append(convert(val) if convert is not None else val)
+        values.append(task_id)
+        await self._conn.execute(_update_sql(tuple(fields)), values)
         await self._conn.commit()
 
     async def count_tasks(self, status: TaskStatus) -> int:
-        async with self._conn.execute(
-            "SELECT COUNT(*) FROM tasks WHERE status = ?", (status.value,)
-        ) as cursor:
-            row = await cursor.fetchone()
+        async with self._acquire_reader() as conn:
+            async with conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE status = ?", (status.value,)
+            ) as cursor:
+                row = await cursor.fetchone()
         return row[0]
 
-    async def get_next_pending_task(self) -> Optional[Task]:
-        # Order: urgent > high > medium > low, then created_at ASC
-        async with self._conn.execute(
-            """
-            SELECT * FROM tasks
-            WHERE status = 'pending'
-            ORDER BY
-                CASE priority
-                    WHEN 'urgent' THEN 4
-                    WHEN 'high'   THEN 3
-                    WHEN 'medium' THEN 2
-                    WHEN 'low'    THEN 1
-                    ELSE 0
-                END DESC,
-                created_at ASC
-            LIMIT 1
-            """
-        ) as cursor:
-            row = await cursor.fetchone()
+    async def get_next_pending_task(self, exclude_ids: Sequence[int] = ()) -> Optional[Task]:
+        # Order: urgent > high > medium > low, then created_at ASC.
+        # Served directly by idx_tasks_dispatch — no scan + sort.
+        # exclude_ids skips tasks the caller already found not ready.
+        async with self._acquire_reader() as conn:
+            async with conn.execute(
+                """
+                SELECT * FROM tasks
+                WHERE status = 'pending'
+                  AND id NOT IN (SELECT value FROM json_each(?))
+                ORDER BY priority_rank DESC, created_at ASC
+                LIMIT 1
+                """,
+                (orjson.dumps(list(exclude_ids)).decode(),),
+            ) as cursor:
+                row = await cursor.fetchone()
         if row is None:
             return None
         return _row_to_task(row)
 
+    async def dependencies_met(self, task_id: int) -> bool:
+        """True if every task in task_id's depends_on exists and is completed.
+
+        Walks the JSON array with json_each inside SQLite, so no task rows
+        (or depends_on lists) are decoded in Python.
+        """
+        async with self._acquire_reader() as conn:
+            async with conn.execute(
+                """
+                SELECT NOT EXISTS (
+                    SELECT 1 FROM tasks t, json_each(t.depends_on) d
+                    LEFT JOIN tasks dep ON dep.id = d.value
+                    WHERE t.id = ?
+                      AND (dep.id IS NULL OR dep.status != 'completed')
+                )
+                """,
+                (task_id,),
+            ) as cursor:
+                row = await cursor.fetchone()
+        return bool(row[0])
+
     async def add_log(
         self,
         task_id: int,
@@ -218,12 +434,26 @@ class Database:
         )
         await self._conn.commit()
 
+    async def add_logs_bulk(
+        self,
+        rows: list[tuple[int, str, str, Optional[str]]],
+    ) -> None:
+        """Insert many (task_id, level, message, raw_output) rows in one commit."""
+        if not rows:
+            return
+        await self._conn.executemany(
+            "INSERT INTO task_logs (task_id, level, message, raw_output) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        await self._conn.commit()
+
     async def get_task_logs(self, task_id: int) -> list[TaskLog]:
-        async with self._conn.execute(
-            "SELECT * FROM task_logs WHERE task_id = ? ORDER BY timestamp ASC",
-            (task_id,),
-        ) as cursor:
-            rows = await cursor.fetchall()
+        async with self._acquire_reader() as conn:
+            async with conn.execute(
+                "SELECT * FROM task_logs WHERE task_id = ? ORDER BY timestamp ASC",
+                (task_id,),
+            ) as cursor:
+                rows = await cursor.fetchall()
         return [_row_to_log(r) for r in rows]
 
     async def add_plan(
@@ -256,13 +486,35 @@ class Database:
 
     async def get_task_plans(self, task_id: int) -> list[TaskPlan]:
         """Get all plan versions for a task, ordered by version."""
-        async with self._conn.execute(
-            "SELECT * FROM task_plans WHERE task_id = ? ORDER BY version ASC",
-            (task_id,),
-        ) as cursor:
-            rows = await cursor.fetchall()
+        async with self._acquire_reader() as conn:
+            async with conn.execute(
+                "SELECT * FROM task_plans WHERE task_id = ? ORDER BY version ASC",
+                (task_id,),
+            ) as cursor:
+                rows = await cursor.fetchall()
         return [TaskPlan(**dict(r)) for r in rows]
 
+    async def bulk_reset_stuck(self) -> int:
+        """Put every in_progress task back to pending; returns how many.
+
+        Used at startup, when no worker survives from the previous run.
+        """
+        cursor = await self._conn.execute(
+            "UPDATE tasks SET status = 'pending', worker_pid = NULL "
+            "WHERE status = 'in_progress'"
+        )
+        await self._conn.commit()
+        return cursor.rowcount
+
     async def delete_task(self, task_id: int) -> None:
         await self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
         await self._conn.commit()
+
+    async def delete_tasks(self, task_ids: list[int]) -> int:
+        """Delete several tasks in one statement; returns how many existed."""
+        cursor = await self._conn.execute(
+            "DELETE FROM tasks WHERE id IN (SELECT value FROM json_each(?))",
+            (orjson.dumps(task_ids).decode(),),
+        )
+        await self._conn.commit()
+        return cursor.rowcount
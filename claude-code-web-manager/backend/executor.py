@@ -1,18 +1,140 @@
 import asyncio
-import json
+import logging
 import os
 import shutil
+import signal
+import uuid
 from pathlib import Path
-from typing import Callable, Awaitable, Optional
+from typing import BinaryIO, Callable, Awaitable, Optional
+
+import orjson
 
 from backend.models import Task, TaskMode
 from backend.worktree import (
+    claim_worktree,
+    create_detached_worktree,
     create_worktree,
     remove_worktree,
     cleanup_branch,
     WorktreeError,
 )
 
+logger = logging.getLogger(__name__)
+
+# Per-task log output is batched up to 64KB and written to disk at least
+# once per LOG_FLUSH_INTERVAL seconds while streaming.
+LOG_BUFFER_SIZE = 64 * 1024
+LOG_FLUSH_INTERVAL = 1.0
+
+# Seconds to wait for claude to exit after SIGTERM before sending SIGKILL.
+KILL_TIMEOUT = 2.0
+
+# StreamReader line limit for claude's stdout; NDJSON events that embed
+# file contents routinely exceed asyncio's 64KB default.
+STREAM_LIMIT = 8 * 1024 * 1024
+
+# stream-json event types _process_ndjson_line acts on; see its fast path.
+EVENT_TYPE_PREFIX = b'{"type":"'
+HANDLED_EVENT_TYPES = frozenset({b"assistant", b"result", b"system"})
+
+# Yield to the event loop after this many stdout lines.
+YIELD_EVERY_LINES = 64
+
+# claude workers run at this nice level so a busy worker can't starve the
+# API's event loop.
+WORKER_NICE = 10
+
+# Spare worktrees live in this subdirectory of worktree_dir.
+WORKTREE_POOL_DIR = "_pool"
+
+# Only the tail of stderr is kept for the task's error field.
+STDERR_TAIL_BYTES = 64 * 1024
+
+
+async def read_tail(stream: asyncio.StreamReader, limit: int = STDERR_TAIL_BYTES) -> bytes:
+    """Read a stream to EOF, keeping only its last `limit` bytes in memory."""
+    tail = bytearray()
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            break
+        tail += chunk
+        if len(tail) > limit:
+            del tail[:-limit]
+    return bytes(tail)
+
+
+async def read_line(stream: asyncio.StreamReader) -> bytes:
+    """Read one line, including its "\n", or b"" at EOF.
+
+    Lines are split by StreamReader.readuntil() in C.  A line longer than the
+    stream's limit is accumulated via LimitOverrunError instead of raising,
+    so there is no upper bound on line length.
+    """
+    pending = bytearray()
+    while True:
+        try:
+            line = await stream.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            # EOF: whatever is left is a final line without "\n"
+            line = e.partial
+        except asyncio.LimitOverrunError as e:
+            pending += await stream.read(e.consumed)
+            continue
+        if pending:
+            pending += line
+            return bytes(pending)
+        return line
+
+
+def _write_log(log_file: BinaryIO, data: bytes) -> None:
+    """Append a batch to a task log and push it to the OS (worker thread)."""
+    log_file.write(data)
+    log_file.flush()
+
+
+def _close_log(log_file: BinaryIO, data: bytes) -> None:
+    """Write the final batch and close the task log (worker thread)."""
+    with log_file:
+        log_file.write(data)
+
+
+# Git instructions appended to execute-mode prompts; filled in per task.
+WORKFLOW_SUFFIX_TEMPLATE = """
+
+## Post-Implementation Workflow
+IMPORTANT: You are being run by the Claude Code Web Manager, not the task orchestrator.
+Ignore the "Task Lifecycle" and "Strict Rules" sections in CLAUDE.md — those steps
+(claiming tasks, updating dev-tasks.json, PROGRESS.md, cleanup) are handled by the web manager.
+Focus on implementing the requested changes, then follow the git steps below.
+
+After completing your implementation, you MUST follow these git steps:
+1. Stage and commit all changes:
+   git add .
+   git commit -m "[task-{task_id}] {title}"
+2. Merge your branch into main from the base repo:
+   cd {base_repo}
+   git merge {branch}
+3. Push to origin:
+   git push origin main
+
+If any git step fails, report the error clearly but do not retry more than once.
+Your current branch is: {branch}
+Your working directory is: {worktree_path}
+The main repository is at: {base_repo}
+"""
+
+
+def _deprioritize(pid: int) -> None:
+    """Lower a worker's CPU priority.
+
+    Applied right after spawn; processes claude starts later inherit it.
+    """
+    try:
+        os.setpriority(os.PRIO_PROCESS, pid, WORKER_NICE)
+    except OSError:
+        pass
+
 
 class ClaudeCodeExecutor:
     def __init__(
@@ -21,22 +143,98 @@ class ClaudeCodeExecutor:
         base_repo: str = "/home/ubuntu/personal_coder",
         log_dir: str = "/home/ubuntu/task-logs",
         worktree_dir: str = "/home/ubuntu/personal_coder-worktrees",
+        worktree_pool_size: int = 0,
     ):
         self.max_workers = max_workers
+        # Hard cap on concurrently running tasks, whoever calls execute_task
+        self._slots = asyncio.Semaphore(max_workers)
         self.base_repo = base_repo
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
         self.worktree_dir = worktree_dir
         self.active_tasks: dict[int, asyncio.subprocess.Process] = {}
+        # Tasks still waiting for a slot, so cancel_task can drop them
+        self._queued_tasks: dict[int, asyncio.Task] = {}
+        self._shutting_down = False
         # Track worktree info per task for cleanup
         self._task_worktrees: dict[int, tuple[str, str]] = {}  # task_id -> (branch, path)
-
-    def _worktree_info(self, task: Task) -> tuple[str, str]:
-        """Return (branch, worktree_path) for a task."""
+        # Pre-created detached worktrees that tasks claim instead of running
+        # a full `git worktree add`; refilled in the background.
+        self.worktree_pool_size = worktree_pool_size
+        self._spare_worktrees: list[str] = []
+        self._spares_pending = 0
+        self._pool_scanned = False
+        self._pool_refills: set[asyncio.Task] = set()
+        # Resolved once; a failed lookup is retried per task so installing
+        # claude after startup still works.
+        self._claude_path: Optional[str] = shutil.which("claude")
+        # Same environment for every claude subprocess; build it once
+        self._subprocess_env = self._build_subprocess_env()
+
+    def _resolve_claude(self) -> Optional[str]:
+        if self._claude_path is None:
+            self._claude_path = shutil.which("claude")
+        return self._claude_path
+
+    def _compute_worktree_info(self, task: Task) -> tuple[str, str]:
+        """Derive (branch, worktree_path) for a task from its id and title.
+
+        Only used when a task is first registered; afterwards the stored
+        value in _task_worktrees is the source of truth.
+        """
         branch = f"task-{task.id}-{task.title[:20].replace(' ', '-')}"
         path = os.path.join(self.worktree_dir, branch)
         return branch, path
 
+    async def fill_worktree_pool(self) -> None:
+        """Create spare worktrees until worktree_pool_size are ready.
+
+        Spares left in the pool directory by a previous run are reused.
+        """
+        pool_dir = Path(self.worktree_dir) / WORKTREE_POOL_DIR
+        if not self._pool_scanned:
+            self._pool_scanned = True
+            if pool_dir.is_dir():
+                self._spare_worktrees.extend(
+                    str(p) for p in sorted(pool_dir.iterdir()) if (p / ".git").exists()
+                )
+        missing = self.worktree_pool_size - len(self._spare_worktrees) - self._spares_pending
+        if missing > 0:
+            await asyncio.gather(*(self._add_spare_worktree() for _ in range(missing)))
+
+    async def _add_spare_worktree(self) -> None:
+        path = os.path.join(
+            self.worktree_dir, WORKTREE_POOL_DIR, f"spare-{uuid.uuid4().hex[:8]}"
+        )
+        self._spares_pending += 1
+        try:
+            await create_detached_worktree(self.base_repo, path)
+        except WorktreeError as e:
+            logger.warning("could not create spare worktree: %s", e)
+        else:
+            self._spare_worktrees.append(path)
+        finally:
+            self._spares_pending -= 1
+
+    def stop_worktree_pool(self) -> None:
+        """Cancel background spare-worktree refills (on shutdown)."""
+        for refill in list(self._pool_refills):
+            refill.cancel()
+
+    async def _create_task_worktree(self, branch: str, path: str) -> None:
+        """Create a task's worktree, from a spare when one is ready."""
+        if self._spare_worktrees:
+            spare = self._spare_worktrees.pop()
+            refill = asyncio.create_task(self.fill_worktree_pool())
+            self._pool_refills.add(refill)
+            refill.add_done_callback(self._pool_refills.discard)
+            try:
+                await claim_worktree(self.base_repo, spare, branch, path)
+                return
+            except WorktreeError as e:
+                logger.warning("spare worktree %s unusable, creating fresh: %s", spare, e)
+        await create_worktree(self.base_repo, branch, path)
+
     def _build_subprocess_env(self) -> dict[str, str]:
         """Build a clean environment for the claude subprocess."""
         env = {**os.environ, "CLAUDE_CODE_DISABLE_NONESSENTIAL_TRAFFIC": "1"}
@@ -50,22 +248,57 @@ class ClaudeCodeExecutor:
         on_output: Callable[[int, str], Awaitable[None]],
         on_complete: Callable[..., Awaitable[None]],
     ):
-        print(f"[executor] task {task.id}: starting execution (title={task.title!r})")
+        """Run a task in its own worktree and stream its output.
+
+        At most max_workers tasks run at once; further calls wait for a slot
+        before creating their worktree.  Cancelling a task while it waits
+        returns without running it or calling on_complete.
+
+        on_output is awaited once per streamed event, so it should return
+        without blocking whenever there is no backpressure.
+        """
+        self._queued_tasks[task.id] = asyncio.current_task()
+        try:
+            await self._slots.acquire()
+        except asyncio.CancelledError:
+            # Still registered means cancel_task didn't ask for this
+            if self._queued_tasks.pop(task.id, None) is not None:
+                raise
+            logger.info("task %d: cancelled while waiting for a slot", task.id)
+            return
+        self._queued_tasks.pop(task.id, None)
+        try:
+            await self._execute_task(task, on_output, on_complete)
+        finally:
+            self._slots.release()
+
+    async def _execute_task(
+        self,
+        task: Task,
+        on_output: Callable[[int, str], Awaitable[None]],
+        on_complete: Callable[..., Awaitable[None]],
+    ):
+        logger.info("task %d: starting execution (title=%r)", task.id, task.title)
 
         # 1. Create worktree via worktree module
-        branch, worktree_path = self._worktree_info(task)
-        self._task_worktrees[task.id] = (branch, worktree_path)
+        # A rerun reuses the registered worktree, even if the title changed,
+        # so the earlier checkout is replaced rather than orphaned.
+        info = self._task_worktrees.get(task.id)
+        if info is None:
+            info = self._task_worktrees[task.id] = self._compute_worktree_info(task)
+        branch, worktree_path = info
 
         try:
-            print(f"[executor] task {task.id}: creating worktree branch={branch} path={worktree_path}")
-            await create_worktree(self.base_repo, branch, worktree_path)
-            print(f"[executor] task {task.id}: worktree created successfully")
+            logger.debug("task %d: creating worktree branch=%s path=%s", task.id, branch, worktree_path)
+            await self._create_task_worktree(branch, worktree_path)
+            logger.debug("task %d: worktree created successfully", task.id)
         except Exception as e:
-            print(f"[executor] task {task.id}: worktree creation failed: {e}")
+            logger.warning("task %d: worktree creation failed: %s", task.id, e)
             self._task_worktrees.pop(task.id, None)
             await on_complete(task.id, exit_code=1, error=f"worktree creation failed: {e}")
             return
 
+        stderr_task: Optional[asyncio.Task] = None
         try:
             # 2. Build prompt and command flags based on mode
             prompt = task.prompt
@@ -113,33 +346,16 @@ Request: {prompt}"""
 {prompt}"""
 
                 # Append git workflow instructions (only for execute mode)
-                workflow_suffix = f"""
-
-## Post-Implementation Workflow
-IMPORTANT: You are being run by the Claude Code Web Manager, not the task orchestrator.
-Ignore the "Task Lifecycle" and "Strict Rules" sections in CLAUDE.md — those steps
-(claiming tasks, updating dev-tasks.json, PROGRESS.md, cleanup) are handled by the web manager.
-Focus on implementing the requested changes, then follow the git steps below.
-
-After completing your implementation, you MUST follow these git steps:
-1. Stage and commit all changes:
-   git add .
-   git commit -m "[task-{task.id}] {task.title}"
-2. Merge your branch into main from the base repo:
-   cd {self.base_repo}
-   git merge {branch}
-3. Push to origin:
-   git push origin main
-
-If any git step fails, report the error clearly but do not retry more than once.
-Your current branch is: {branch}
-Your working directory is: {worktree_path}
-The main repository is at: {self.base_repo}
-"""
-                prompt = prompt + workflow_suffix
+                prompt = prompt + WORKFLOW_SUFFIX_TEMPLATE.format(
+                    task_id=task.id,
+                    title=task.title,
+                    branch=branch,
+                    worktree_path=worktree_path,
+                    base_repo=self.base_repo,
+                )
 
             # 3. Build command — resolve claude to absolute path
-            claude_path = shutil.which("claude")
+            claude_path = self._resolve_claude()
             if not claude_path:
                 raise FileNotFoundError("claude CLI not found in PATH")
 
@@ -156,58 +372,86 @@ The main repository is at: {self.base_repo}
             if is_plan_mode:
                 cmd.extend(["--max-turns", "1"])
 
-            # 4. Launch subprocess
-            print(f"[executor] task {task.id}: launching subprocess: {claude_path}")
+            # 4. Launch subprocess.  Each task gets its own claude process:
+            # `-p` is one-shot and the process cwd must be the task's
+            # worktree, so a process can't be pooled and reused across tasks.
+            logger.debug("task %d: launching subprocess: %s", task.id, claude_path)
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 cwd=worktree_path,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
-                env=self._build_subprocess_env(),
+                env=self._subprocess_env,
+                limit=STREAM_LIMIT,
+                # Own session: signals aimed at the server's process group
+                # (e.g. Ctrl-C) don't reach workers.  cancel_task and
+                # shutdown signal the whole group, tools included.
+                start_new_session=True,
             )
+            _deprioritize(process.pid)
             self.active_tasks[task.id] = process
-            print(f"[executor] task {task.id}: subprocess started (pid={process.pid})")
+            # Drain stderr concurrently so a full stderr pipe can't block
+            # claude (and with it our stdout loop) before it exits.
+            stderr_task = asyncio.create_task(read_tail(process.stderr))
+            logger.debug("task %d: subprocess started (pid=%d)", task.id, process.pid)
 
             # 5. Stream NDJSON stdout line-by-line, parse each event
             log_path = self.log_dir / f"task-{task.id}.log"
             parsed: dict = {}  # populated by _process_ndjson_line
 
-            with open(log_path, "w") as log_file:
-                # Read raw chunks instead of lines to avoid asyncio's 64KB
-                # StreamReader limit.  NDJSON lines can be arbitrarily large
-                # (e.g. when Claude reads a big file, the JSON event for that
-                # read can exceed 64KB).  We accumulate chunks in a buffer and
-                # split on newlines ourselves — no upper bound on line length.
-                buf = b""
+            loop = asyncio.get_running_loop()
+            last_flush = loop.time()
+
+            # The log is written in batches on a worker thread, so disk
+            # latency never blocks the event loop.  A batch goes out once it
+            # reaches LOG_BUFFER_SIZE or LOG_FLUSH_INTERVAL seconds have passed
+            # (so `tail -f` stays reasonably live), and on exit.
+            log_file = await asyncio.to_thread(open, log_path, "wb")
+            log_batch: list[bytes] = []
+            log_batch_size = 0
+            try:
+                # NDJSON lines can be large (e.g. when Claude reads a big file
+                # the JSON event for that read can exceed asyncio's default
+                # 64KB line limit), so the pipe is opened with STREAM_LIMIT and
+                # read_line() reassembles anything longer than even that.
+                since_yield = 0
                 while True:
-                    chunk = await process.stdout.read(65536)
-                    if not chunk:
+                    line = await read_line(process.stdout)
+                    if not line:
                         break
-                    buf += chunk
-                    while b"\n" in buf:
-                        raw_line, buf = buf.split(b"\n", 1)
-                        decoded = raw_line.decode().rstrip()
-                        if not decoded:
-                            continue
-                        log_file.write(decoded + "\n")
-                        log_file.flush()
+                    # The raw NDJSON bytes are exactly what the log should
+                    # hold, so log each line as read, independent of parsing.
+                    log_batch.append(line)
+                    log_batch_size += len(line)
+                    if (
+                        log_batch_size >= LOG_BUFFER_SIZE
+                        or loop.time() - last_flush >= LOG_FLUSH_INTERVAL
+                    ):
+                        data = b"".join(log_batch)
+                        log_batch.clear()
+                        log_batch_size = 0
+                        await asyncio.to_thread(_write_log, log_file, data)
+                        last_flush = loop.time()
+                    raw_line = line.rstrip()
+                    if raw_line:
                         await self._process_ndjson_line(
-                            decoded, task.id, on_output, parsed,
+                            raw_line, task.id, on_output, parsed,
                         )
-
-                # Flush any trailing data without a final newline
-                if buf.strip():
-                    decoded = buf.decode().rstrip()
-                    log_file.write(decoded + "\n")
-                    log_file.flush()
-                    await self._process_ndjson_line(
-                        decoded, task.id, on_output, parsed,
-                    )
-
-            # 6. Wait for process and collect stderr
+                    # readuntil() returns without suspending while data is
+                    # buffered, so a fast producer could otherwise starve
+                    # HTTP/WebSocket handlers on the same loop.
+                    since_yield += 1
+                    if since_yield >= YIELD_EVERY_LINES:
+                        since_yield = 0
+                        await asyncio.sleep(0)
+            finally:
+                await asyncio.to_thread(_close_log, log_file, b"".join(log_batch))
+
+            # 6. Collect stderr and wait for process
+            stderr_bytes = await stderr_task
             await process.wait()
-            stderr_bytes = await process.stderr.read()
-            stderr = stderr_bytes.decode()
+            # The tail may start mid-character
+            stderr = stderr_bytes.decode(errors="replace")
 
             result_text = parsed.get("result_text")
             input_tokens = parsed.get("input_tokens")
@@ -218,24 +462,29 @@ The main repository is at: {self.base_repo}
             if result_text is None:
                 result_text = stderr or "(no output)"
 
-            print(f"[executor] task {task.id}: subprocess exited (code={process.returncode}, result_len={len(result_text)}, stderr_len={len(stderr)})")
+            logger.info(
+                "task %d: subprocess exited (code=%s, result_len=%d, stderr_len=%d)",
+                task.id, process.returncode, len(result_text), len(stderr),
+            )
 
             # Extract plan: in plan mode, the entire output IS the plan
             # For backward compat, also handle ---PLAN END--- delimiter
-            if is_plan_mode and result_text:
-                if "---PLAN END---" in result_text:
-                    plan_text = result_text.split("---PLAN END---", 1)[0].strip()
-                else:
-                    plan_text = result_text.strip()
-            elif "---PLAN END---" in result_text:
-                plan_text = result_text.split("---PLAN END---", 1)[0].strip()
+            head, sep, _ = result_text.partition("---PLAN END---")
+            if sep:
+                plan_text = head.strip()
+            elif is_plan_mode and result_text:
+                plan_text = result_text.strip()
 
             self.active_tasks.pop(task.id, None)
+            if self._shutting_down:
+                # Left in progress; startup recovery re-queues it
+                logger.info("task %d: stopped by shutdown", task.id)
+                return
 
             # 7. Cleanup worktree on failure
             exit_code = process.returncode
             if exit_code != 0:
-                print(f"[executor] task {task.id}: cleaning up worktree after failure")
+                logger.debug("task %d: cleaning up worktree after failure", task.id)
                 await self._cleanup_worktree(task.id)
 
             await on_complete(
@@ -250,32 +499,51 @@ The main repository is at: {self.base_repo}
                 is_plan_mode=is_plan_mode,
             )
         except Exception as e:
-            print(f"[executor] task {task.id}: unhandled exception: {e}")
+            logger.exception("task %d: unhandled exception: %s", task.id, e)
+            if stderr_task is not None:
+                stderr_task.cancel()
             self.active_tasks.pop(task.id, None)
             await self._cleanup_worktree(task.id)
             await on_complete(task.id, exit_code=1, error=f"execution failed: {e}")
 
     async def _process_ndjson_line(
         self,
-        decoded: str,
+        raw_line: bytes,
         task_id: int,
         on_output: Callable,
         parsed: dict,
     ) -> None:
-        """Parse a single NDJSON line and dispatch to on_output / collect results."""
+        """Parse a single NDJSON line and dispatch to on_output / collect results.
+
+        The line is handed to orjson as bytes; it is only decoded when it is
+        not JSON and has to be forwarded as plain text.  Lines are split on
+        b"\n", which never occurs inside a UTF-8 sequence, so each line can be
+        decoded on its own without an incremental decoder.
+        """
+        # claude writes compact JSON with "type" as the first key, so events
+        # we ignore (e.g. "user" tool results, often the largest lines) are
+        # recognised from their prefix and never parsed.
+        if raw_line.startswith(EVENT_TYPE_PREFIX):
+            end = raw_line.find(b'"', len(EVENT_TYPE_PREFIX))
+            if raw_line[len(EVENT_TYPE_PREFIX):end] not in HANDLED_EVENT_TYPES:
+                return
+
         try:
-            event = json.loads(decoded)
-        except json.JSONDecodeError:
-            await on_output(task_id, decoded)
+            event = orjson.loads(raw_line)
+        except orjson.JSONDecodeError:
+            await on_output(task_id, raw_line.decode(errors="replace"))
             return
 
         event_type = event.get("type")
 
         if event_type == "assistant":
+            # One on_output call per event: every call becomes a log row and
+            # a WebSocket frame, so blocks are joined into a single payload.
+            parts: list[str] = []
             msg = event.get("message", {})
             for block in msg.get("content", []):
                 if block.get("type") == "text":
-                    await on_output(task_id, block["text"])
+                    parts.append(block["text"])
                 elif block.get("type") == "tool_use":
                     tool_name = block.get("name", "tool")
                     tool_input = block.get("input", {})
@@ -286,7 +554,9 @@ The main repository is at: {self.base_repo}
                         summary = f"[{tool_name}: {tool_input['file_path']}]"
                     elif tool_name == "Read" and "file_path" in tool_input:
                         summary = f"[Reading: {tool_input['file_path']}]"
-                    await on_output(task_id, summary)
+                    parts.append(summary)
+            if parts:
+                await on_output(task_id, "\n".join(parts))
 
         elif event_type == "result":
             parsed["result_text"] = event.get("result", "")
@@ -300,16 +570,51 @@ The main repository is at: {self.base_repo}
             await on_output(task_id, f"[Session started — model: {model}]")
 
     async def cancel_task(self, task_id: int) -> None:
-        proc = self.active_tasks.get(task_id)
+        waiter = self._queued_tasks.pop(task_id, None)
+        if waiter is not None:
+            waiter.cancel()
+            return
+        proc = self.active_tasks.pop(task_id, None)
         if proc is not None:
-            try:
-                proc.terminate()
-            except ProcessLookupError:
-                pass
-            self.active_tasks.pop(task_id, None)
+            await self._terminate(proc)
         # Cleanup worktree on cancel
         await self._cleanup_worktree(task_id)
 
+    async def shutdown(self) -> None:
+        """Stop all work on server shutdown.
+
+        Running claude processes are terminated without calling on_complete,
+        so their tasks stay in progress for startup recovery to re-queue.
+        """
+        self._shutting_down = True
+        self.stop_worktree_pool()
+        for task_id in list(self._queued_tasks):
+            self._queued_tasks.pop(task_id).cancel()
+        procs = list(self.active_tasks.values())
+        self.active_tasks.clear()
+        await asyncio.gather(*(self._terminate(proc) for proc in procs))
+
+    async def _terminate(self, proc: asyncio.subprocess.Process) -> None:
+        """Terminate claude's process group and reap claude.
+
+        claude runs in its own session, so the group also holds any tools it
+        started.  Whatever is left of the group after KILL_TIMEOUT (or once
+        claude has exited) gets SIGKILL.
+        """
+        try:
+            os.killpg(proc.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=KILL_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            return
+        await proc.wait()
+
     async def _cleanup_worktree(self, task_id: int) -> None:
         """Remove worktree and branch for a task if they exist."""
         info = self._task_worktrees.pop(task_id, None)
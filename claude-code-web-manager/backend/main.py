@@ -1,21 +1,29 @@
 import asyncio
-import json
+import hashlib
+import logging
 import os
 import shutil
 from contextlib import asynccontextmanager
 from typing import Optional
 
+import orjson
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect, Depends, HTTPException, Header
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from backend.database import Database
 from backend.executor import ClaudeCodeExecutor
 from backend.scheduler import TaskScheduler
 from backend.task_registry import TaskRegistry
-from backend.models import Task, TaskStatus, TaskMode, CreateTaskRequest, RejectPlanRequest
+from backend.models import Task, TaskStatus, TaskMode, CreateTaskRequest, RejectPlanRequest, DeleteTasksRequest
 from backend.chat import ChatSession
 
+# Executor progress goes through logging; LOG_LEVEL=DEBUG shows per-step detail
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="[%(name)s] %(message)s",
+)
+
 # ── Singletons ────────────────────────────────────────────────────────────────
 
 db = Database(db_path=os.getenv("DB_PATH", "tasks.db"))
@@ -24,6 +32,7 @@ executor = ClaudeCodeExecutor(
     base_repo=os.getenv("BASE_REPO", "/home/ubuntu/personal_coder"),
     log_dir=os.getenv("LOG_DIR", "/home/ubuntu/task-logs"),
     worktree_dir=os.getenv("WORKTREE_DIR", "/home/ubuntu/personal_coder-worktrees"),
+    worktree_pool_size=int(os.getenv("WORKTREE_POOL_SIZE", "0")),
 )
 registry = TaskRegistry(
     registry_path=os.getenv("REGISTRY_PATH", os.path.join(
@@ -36,31 +45,66 @@ API_KEY = os.getenv("API_KEY", "")
 
 # ── WebSocket manager ─────────────────────────────────────────────────────────
 
+# Seconds a client gets to accept a frame before it is dropped, so one
+# stuck socket can't stall the flusher while the queue grows behind it
+SEND_TIMEOUT = 5.0
+
+
 class ConnectionManager:
+    """Fans broadcast messages out to every connected /ws client.
+
+    broadcast() only queues the message.  A single flusher task sends
+    everything queued since its last send as one JSON-array frame, so a
+    burst of events costs one frame per client rather than one per event.
+    Frames are UTF-8 JSON built once as bytes and sent as binary messages,
+    so nothing is re-encoded per client.
+    """
+
     def __init__(self):
-        self.connections: list[WebSocket] = []
+        self.connections: set[WebSocket] = set()
+        self._pending: list[bytes] = []
+        self._flusher: Optional[asyncio.Task] = None
 
     async def connect(self, ws: WebSocket) -> None:
         await ws.accept()
-        self.connections.append(ws)
+        self.connections.add(ws)
 
     def disconnect(self, ws: WebSocket) -> None:
-        if ws in self.connections:
-            self.connections.remove(ws)
+        self.connections.discard(ws)
 
     async def broadcast(self, task_id: int, data: dict) -> None:
-        msg = json.dumps({"task_id": task_id, **data})
-        dead: list[WebSocket] = []
-        # Iterate over a copy to avoid "list changed size during iteration"
-        # when concurrent broadcasts or disconnects modify self.connections
-        for conn in list(self.connections):
-            try:
-                await conn.send_text(msg)
-            except Exception:
-                dead.append(conn)
-        for conn in dead:
-            if conn in self.connections:
-                self.connections.remove(conn)
+        self._pending.append(orjson.dumps({"task_id": task_id, **data}))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        # Messages queued while a frame is being sent go out in the next one
+        while self._pending:
+            frame = b"[" + b",".join(self._pending) + b"]"
+            self._pending = []
+            await self._send_all(frame)
+
+    async def _send_all(self, frame: bytes) -> None:
+        # Snapshot the set so concurrent connects/disconnects can't change it
+        # mid-send.  Every client is sent to concurrently, and one that fails
+        # or takes longer than SEND_TIMEOUT is dropped.
+        conns = list(self.connections)
+        results = await asyncio.gather(
+            *(asyncio.wait_for(conn.send_bytes(frame), SEND_TIMEOUT) for conn in conns),
+            return_exceptions=True,
+        )
+        dropped = [conn for conn, result in zip(conns, results) if isinstance(result, Exception)]
+        if not dropped:
+            return
+        for conn in dropped:
+            self.connections.discard(conn)
+        # Close dropped sockets so their clients notice and reconnect, rather
+        # than staying connected without updates.  Errors are ignored: the
+        # socket is often already gone.
+        await asyncio.gather(
+            *(asyncio.wait_for(conn.close(code=1011), SEND_TIMEOUT) for conn in dropped),
+            return_exceptions=True,
+        )
 
 
 ws_manager = ConnectionManager()
@@ -68,11 +112,24 @@ ws_manager = ConnectionManager()
 
 # ── Registry sync helper ─────────────────────────────────────────────────────
 
-async def _sync_registry() -> None:
-    """Read all DB tasks and sync to dev-tasks.json."""
+async def _sync_registry(*task_ids: int) -> None:
+    """Sync dev-tasks.json with the DB.
+
+    With task_ids, only those tasks are re-read (and dropped if deleted);
+    without, every task is re-read.
+    """
     try:
-        tasks = await db.list_tasks()
-        await registry.sync(tasks)
+        if not task_ids:
+            await registry.sync(await db.list_tasks())
+            return
+        changed, removed = [], []
+        for task_id in task_ids:
+            task = await db.get_task(task_id)
+            if task is None:
+                removed.append(task_id)
+            else:
+                changed.append(task)
+        await registry.update(changed, removed)
     except Exception as e:
         print(f"[registry] sync error: {e}")
 
@@ -89,17 +146,22 @@ scheduler = TaskScheduler(
 # ── Startup recovery ──────────────────────────────────────────────────────────
 
 async def _recover_stuck_tasks() -> None:
-    stuck = await db.list_tasks(status=TaskStatus.IN_PROGRESS)
-    for task in stuck:
-        await db.update_task(task.id, status=TaskStatus.PENDING, worker_pid=None)
-    if stuck:
-        print(f"[startup] recovered {len(stuck)} stuck task(s) → pending")
+    recovered = await db.bulk_reset_stuck()
+    if recovered:
+        print(f"[startup] recovered {recovered} stuck task(s) → pending")
 
 
 # ── Lifespan (NOT deprecated @app.on_event) ───────────────────────────────────
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Python 3.12+: run tasks eagerly so coroutines that finish without
+    # blocking (e.g. output callbacks) skip the event-loop scheduling hop.
+    loop = asyncio.get_running_loop()
+    if hasattr(asyncio, "eager_task_factory"):
+        loop.set_task_factory(asyncio.eager_task_factory)
+    # uvicorn's default --loop auto picks uvloop whenever it is installed
+    print(f"[startup] event loop: {type(loop).__module__}.{type(loop).__name__}")
     await db.init()
     await _recover_stuck_tasks()
     claude_path = shutil.which("claude")
@@ -109,10 +171,15 @@ async def lifespan(app: FastAPI):
         print("[startup] WARNING: claude CLI not found in PATH — tasks will fail")
     registry.load_cli_tasks()
     await _sync_registry()
+    pool_task = asyncio.create_task(executor.fill_worktree_pool())
     scheduler_task = asyncio.create_task(scheduler.start())
     yield
     scheduler.stop()
     scheduler_task.cancel()
+    pool_task.cancel()
+    await executor.shutdown()
+    await scheduler.shutdown()
+    await registry.flush()
     await db.close()
 
 
@@ -148,16 +215,16 @@ async def create_task(req: CreateTaskRequest, request: Request):
         tags=req.tags,
         created_by=created_by,
     )
-    await _sync_registry()
+    scheduler.wake()
+    await _sync_registry(task.id)
     return task
 
 
 @app.post("/api/tasks/batch", dependencies=[Depends(verify_api_key)], status_code=201)
 async def create_tasks_batch(reqs: list[CreateTaskRequest], request: Request):
     created_by = request.client.host if request.client else None
-    tasks = []
-    for req in reqs:
-        task = await db.create_task(
+    tasks = await db.create_tasks_bulk([
+        dict(
             title=req.title,
             prompt=req.prompt,
             mode=req.mode.value,
@@ -167,8 +234,10 @@ async def create_tasks_batch(reqs: list[CreateTaskRequest], request: Request):
             tags=req.tags,
             created_by=created_by,
         )
-        tasks.append(task)
-    await _sync_registry()
+        for req in reqs
+    ])
+    scheduler.wake()
+    await _sync_registry(*(t.id for t in tasks))
     return tasks
 
 
@@ -202,7 +271,8 @@ async def cancel_task(task_id: int):
         raise HTTPException(status_code=404, detail="Task not found")
     await scheduler.cancel_task(task_id)
     await db.update_task(task_id, status=TaskStatus.CANCELLED)
-    await _sync_registry()
+    scheduler.wake()
+    await _sync_registry(task_id)
     return {"status": "cancelled"}
 
 
@@ -212,7 +282,8 @@ async def retry_task(task_id: int):
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     await db.update_task(task_id, status=TaskStatus.PENDING, error=None)
-    await _sync_registry()
+    scheduler.wake()
+    await _sync_registry(task_id)
     return {"status": "pending"}
 
 
@@ -223,7 +294,8 @@ async def approve_plan(task_id: int):
         raise HTTPException(status_code=404, detail="Task not found")
     # Keep the plan text so executor can feed it into the execution prompt
     await db.update_task(task_id, status=TaskStatus.PENDING, mode=TaskMode.EXECUTE.value)
-    await _sync_registry()
+    scheduler.wake()
+    await _sync_registry(task_id)
     return {"status": "pending"}
 
 
@@ -250,7 +322,8 @@ async def reject_plan(task_id: int, req: RejectPlanRequest):
         prompt=updated_prompt,
         plan=None,
     )
-    await _sync_registry()
+    scheduler.wake()
+    await _sync_registry(task_id)
     return {"status": "pending"}
 
 
@@ -260,10 +333,18 @@ async def delete_task(task_id: int):
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     await db.delete_task(task_id)
-    await _sync_registry()
+    await _sync_registry(task_id)
     return {"status": "deleted"}
 
 
+@app.post("/api/tasks/batch-delete", dependencies=[Depends(verify_api_key)])
+async def delete_tasks_batch(req: DeleteTasksRequest):
+    deleted = await db.delete_tasks(req.ids)
+    if req.ids:
+        await _sync_registry(*req.ids)
+    return {"status": "deleted", "deleted": deleted}
+
+
 # ── WebSocket ─────────────────────────────────────────────────────────────────
 
 @app.websocket("/ws")
@@ -278,20 +359,16 @@ async def websocket_endpoint(ws: WebSocket):
 
 # ── Chat WebSocket ───────────────────────────────────────────────────────────
 
-_chat_sessions: dict[int, ChatSession] = {}  # keyed by id(ws)
-
-
 @app.websocket("/ws/chat")
 async def chat_endpoint(ws: WebSocket):
     await ws.accept()
     base_repo = os.getenv("BASE_REPO", "/home/ubuntu/personal_coder")
+    # The session lives exactly as long as this connection
     session = ChatSession(working_dir=base_repo)
-    ws_id = id(ws)
-    _chat_sessions[ws_id] = session
 
     async def _send(data: dict) -> None:
         try:
-            await ws.send_text(json.dumps(data))
+            await ws.send_text(orjson.dumps(data).decode())
         except Exception:
             pass
 
@@ -299,10 +376,15 @@ async def chat_endpoint(ws: WebSocket):
         while True:
             raw = await ws.receive_text()
             try:
-                msg = json.loads(raw)
-            except json.JSONDecodeError:
+                msg = orjson.loads(raw)
+            except orjson.JSONDecodeError:
                 await _send({"type": "error", "message": "Invalid JSON"})
                 continue
+            # Valid JSON of the wrong shape would otherwise raise below and
+            # end the whole chat connection
+            if not isinstance(msg, dict) or not isinstance(msg.get("text", ""), str):
+                await _send({"type": "error", "message": "Invalid message"})
+                continue
 
             msg_type = msg.get("type")
 
@@ -314,7 +396,7 @@ async def chat_endpoint(ws: WebSocket):
 
                 # Allow changing working directory
                 wd = msg.get("working_dir")
-                if wd and os.path.isdir(wd):
+                if isinstance(wd, str) and wd and os.path.isdir(wd):
                     session.working_dir = wd
 
                 await session.send_message(
@@ -331,13 +413,31 @@ async def chat_endpoint(ws: WebSocket):
                 await _send({"type": "cancelled"})
 
     except WebSocketDisconnect:
+        pass
+    finally:
         await session.cleanup()
-        _chat_sessions.pop(ws_id, None)
 
 
 # ── Static frontend (must be last) ───────────────────────────────────────────
 
 import os as _os
 _frontend_dir = _os.path.join(_os.path.dirname(__file__), "..", "frontend")
+_index_path = _os.path.join(_frontend_dir, "index.html")
+
+if _os.path.isfile(_index_path):
+    # The app shell is one file that only changes on deploy: keep it in
+    # memory and let browsers revalidate with its ETag instead of re-reading
+    # it from disk on every page load.
+    with open(_index_path, "rb") as _f:
+        _index_html = _f.read()
+    _index_etag = f'"{hashlib.sha1(_index_html).hexdigest()}"'
+
+    @app.get("/", include_in_schema=False)
+    async def index(if_none_match: str = Header(default="")) -> Response:
+        headers = {"ETag": _index_etag, "Cache-Control": "no-cache"}
+        if if_none_match == _index_etag:
+            return Response(status_code=304, headers=headers)
+        return Response(_index_html, media_type="text/html", headers=headers)
+
 if _os.path.isdir(_frontend_dir):
     app.mount("/", StaticFiles(directory=_frontend_dir, html=True), name="static")
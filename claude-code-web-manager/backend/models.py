@@ -87,3 +87,7 @@ class CreateTaskRequest(BaseModel):
 
 class RejectPlanRequest(BaseModel):
     feedback: str
+
+
+class DeleteTasksRequest(BaseModel):
+    ids: list[int]
@@ -4,9 +4,15 @@ from typing import Callable, Optional
 
 from backend.models import TaskStatus, TaskMode
 
+# Output lines are buffered per task and flushed — one INSERT batch/commit and
+# one WebSocket message — once this many lines are pending or the interval
+# elapses, whichever is first.
+OUTPUT_FLUSH_LINES = 16
+OUTPUT_FLUSH_INTERVAL = 0.05
+
 
 class TaskScheduler:
-    def __init__(self, executor, db, ws_manager, max_concurrent: int = 3, poll_interval: float = 2.0,
+    def __init__(self, executor, db, ws_manager, max_concurrent: int = 3, poll_interval: float = 30.0,
                  on_state_change: Optional[Callable] = None):
         self.executor = executor
         self.db = db
@@ -14,13 +20,24 @@ class TaskScheduler:
         self.max_concurrent = max_concurrent
         self.poll_interval = poll_interval
         self._running = False
+        # Set whenever a task may have become dispatchable; poll_interval is
+        # only a safety net for changes made outside the API.
+        self._wake = asyncio.Event()
         self._on_state_change = on_state_change
+        self._output_buffers: dict[int, list[str]] = {}
+        self._output_flush_timers: dict[int, asyncio.Task] = {}
+        # Executor runs started by _dispatch, kept so shutdown can reach them
+        self._inflight: set[asyncio.Task] = set()
+        # Ids of tasks this scheduler has put in progress and not yet seen
+        # finish.  Startup recovery re-queues in-progress tasks, so this
+        # matches the DB without counting rows on every dispatch pass.
+        self._active: set[int] = set()
 
-    async def _notify_state_change(self) -> None:
-        """Call the state change callback if set."""
+    async def _notify_state_change(self, task_id: int) -> None:
+        """Call the state change callback for task_id if set."""
         if self._on_state_change is not None:
             try:
-                await self._on_state_change()
+                await self._on_state_change(task_id)
             except Exception as e:
                 print(f"[scheduler] state change callback error: {e}")
 
@@ -32,30 +49,49 @@ class TaskScheduler:
             except Exception as e:
                 # Log but don't crash the scheduler loop
                 print(f"[scheduler] error in loop: {e}")
-            await asyncio.sleep(self.poll_interval)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
 
     async def _dispatch_pending(self):
-        """Dispatch as many pending tasks as available slots allow."""
-        while True:
-            active_count = await self.db.count_tasks(status=TaskStatus.IN_PROGRESS)
-            if active_count >= self.max_concurrent:
-                break
-            next_task = await self.db.get_next_pending_task()
+        """Fill every free slot with the highest-priority ready task.
+
+        Tasks whose dependencies aren't met yet are skipped instead of
+        holding back the tasks queued behind them.
+        """
+        free = self.max_concurrent - len(self._active)
+        blocked: list[int] = []
+        while free > 0:
+            next_task = await self.db.get_next_pending_task(exclude_ids=blocked)
             if next_task is None:
                 break
             if not await self._dependencies_met(next_task):
-                break
+                blocked.append(next_task.id)
+                continue
             await self._dispatch(next_task)
+            free -= 1
 
     def stop(self):
         self._running = False
+        self._wake.set()
+
+    async def shutdown(self) -> None:
+        """Stop dispatching, then cancel and await every in-flight executor run."""
+        self.stop()
+        for t in self._inflight:
+            t.cancel()
+        await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def wake(self) -> None:
+        """Run a dispatch pass now, e.g. after a task is queued or finishes."""
+        self._wake.set()
 
     async def _dependencies_met(self, task) -> bool:
-        for dep_id in task.depends_on:
-            dep = await self.db.get_task(dep_id)
-            if dep is None or dep.status != TaskStatus.COMPLETED:
-                return False
-        return True
+        if not task.depends_on:
+            return True
+        return await self.db.dependencies_met(task.id)
 
     async def _dispatch(self, task) -> None:
         print(f"[scheduler] dispatching task {task.id} (title={task.title!r})")
@@ -67,10 +103,13 @@ class TaskScheduler:
         await self.ws_manager.broadcast(
             task.id, {"type": "status", "status": TaskStatus.IN_PROGRESS}
         )
-        await self._notify_state_change()
+        await self._notify_state_change(task.id)
+        self._active.add(task.id)
         t = asyncio.create_task(
             self.executor.execute_task(task, self._on_output, self._on_complete)
         )
+        self._inflight.add(t)
+        t.add_done_callback(self._inflight.discard)
         t.add_done_callback(lambda fut: self._handle_task_exception(fut, task.id))
 
     def _handle_task_exception(self, fut: asyncio.Future, task_id: int) -> None:
@@ -85,6 +124,8 @@ class TaskScheduler:
 
     async def _fail_task(self, task_id: int, error: str) -> None:
         """Mark a task as failed when the executor raises an unhandled exception."""
+        self._active.discard(task_id)
+        await self._flush_output(task_id)
         try:
             await self.db.update_task(
                 task_id,
@@ -95,17 +136,42 @@ class TaskScheduler:
             await self.ws_manager.broadcast(
                 task_id, {"type": "complete", "status": TaskStatus.FAILED}
             )
-            await self._notify_state_change()
+            await self._notify_state_change(task_id)
         except Exception as e:
             print(f"[scheduler] task {task_id}: failed to mark as failed: {e}")
+        self.wake()
 
     async def _on_output(self, task_id: int, chunk: str) -> None:
+        buf = self._output_buffers.setdefault(task_id, [])
+        buf.append(chunk)
+        if len(buf) >= OUTPUT_FLUSH_LINES:
+            await self._flush_output(task_id)
+        elif task_id not in self._output_flush_timers:
+            self._output_flush_timers[task_id] = asyncio.create_task(
+                self._flush_output_later(task_id)
+            )
+
+    async def _flush_output_later(self, task_id: int) -> None:
+        await asyncio.sleep(OUTPUT_FLUSH_INTERVAL)
+        self._output_flush_timers.pop(task_id, None)
+        await self._flush_output(task_id)
+
+    async def _flush_output(self, task_id: int) -> None:
+        """Log and broadcast any buffered output lines for a task as one batch."""
+        timer = self._output_flush_timers.pop(task_id, None)
+        if timer is not None:
+            timer.cancel()
+        lines = self._output_buffers.pop(task_id, None)
+        if not lines:
+            return
         try:
-            await self.db.add_log(task_id, "info", chunk, raw_output=chunk)
+            await self.db.add_logs_bulk(
+                [(task_id, "info", line, line) for line in lines]
+            )
         except Exception:
             # Task may have been deleted while still executing (e.g. E2E test cleanup)
             pass
-        await self.ws_manager.broadcast(task_id, {"type": "output", "data": chunk})
+        await self.ws_manager.broadcast(task_id, {"type": "output", "lines": lines})
 
     async def _on_complete(
         self,
@@ -119,6 +185,8 @@ class TaskScheduler:
         plan: Optional[str] = None,
         is_plan_mode: bool = False,
     ) -> None:
+        self._active.discard(task_id)
+        await self._flush_output(task_id)
         if exit_code != 0:
             status = TaskStatus.FAILED
         elif is_plan_mode:
@@ -147,7 +215,10 @@ class TaskScheduler:
         await self.ws_manager.broadcast(
             task_id, {"type": "complete", "status": status}
         )
-        await self._notify_state_change()
+        await self._notify_state_change(task_id)
+        # A slot is free and dependents may now be ready
+        self.wake()
 
     async def cancel_task(self, task_id: int) -> None:
         await self.executor.cancel_task(task_id)
+        self._active.discard(task_id)
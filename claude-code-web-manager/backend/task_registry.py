@@ -1,12 +1,17 @@
 import asyncio
-import json
 import os
 import tempfile
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Sequence
+
+import orjson
 
 from backend.models import Task
 
+# update() only marks the registry dirty; one write goes out this many
+# seconds later, so a burst of task changes costs a single file write.
+WRITE_DELAY = 0.2
+
 
 class TaskRegistry:
     """Syncs web manager DB tasks to dev-tasks.json alongside CLI tasks."""
@@ -14,14 +19,18 @@ class TaskRegistry:
     def __init__(self, registry_path: str):
         self.registry_path = registry_path
         self._cli_tasks: list[dict] = []
+        # Registry dicts of web tasks by DB id, in created_at order
+        self._web_tasks: dict[int, dict] = {}
         self._lock = asyncio.Lock()
+        self._dirty = False
+        self._writer: Optional[asyncio.Task] = None
 
     def load_cli_tasks(self) -> None:
         """Read dev-tasks.json and cache CLI task entries."""
         try:
-            with open(self.registry_path, "r") as f:
-                data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+            with open(self.registry_path, "rb") as f:
+                data = orjson.loads(f.read())
+        except (FileNotFoundError, orjson.JSONDecodeError):
             self._cli_tasks = []
             return
 
@@ -63,26 +72,77 @@ class TaskRegistry:
         }
 
     async def sync(self, db_tasks: list[Task]) -> None:
-        """Merge CLI tasks + web DB tasks and write to dev-tasks.json atomically."""
+        """Replace all web tasks with db_tasks and write dev-tasks.json."""
         async with self._lock:
-            web_tasks = [self._web_task_to_dict(t) for t in db_tasks]
-            all_tasks = self._cli_tasks + web_tasks
+            self._web_tasks = {t.id: self._web_task_to_dict(t) for t in db_tasks}
+            await self._write()
+
+    async def update(self, tasks: Sequence[Task] = (), removed_ids: Sequence[int] = ()) -> None:
+        """Upsert changed web tasks, drop deleted ones, and schedule a write.
+
+        Only the given tasks are converted; the rest come from the in-memory
+        copy kept since the last sync, so no full DB read is needed.  The
+        file is written WRITE_DELAY seconds later, together with any other
+        updates made meanwhile; use flush() to wait for it.  Tasks whose
+        registry entry didn't change (e.g. a log-only update) cause no write.
+        """
+        changed = False
+        for t in tasks:
+            entry = self._web_task_to_dict(t)
+            if self._web_tasks.get(t.id) != entry:
+                self._web_tasks[t.id] = entry
+                changed = True
+        for task_id in removed_ids:
+            if self._web_tasks.pop(task_id, None) is not None:
+                changed = True
+        if not changed:
+            return
+        self._dirty = True
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_later())
 
-            # Compute meta summary
-            total_cost = sum(
-                t.get("cost_usd") or 0 for t in all_tasks
-            )
-            meta = {
-                "last_synced_at": datetime.now().isoformat(),
-                "total_cost_usd": round(total_cost, 6),
-                "cli_tasks": len(self._cli_tasks),
-                "web_tasks": len(web_tasks),
-            }
+    async def flush(self) -> None:
+        """Wait until every update so far is on disk (e.g. before shutdown).
+
+        Never raises: write errors are logged by the writer itself.
+        """
+        if self._writer is not None:
+            # wait() rather than awaiting the task, so a cancelled writer
+            # doesn't raise CancelledError into the caller either
+            await asyncio.wait([self._writer])
+
+    async def _write_later(self) -> None:
+        # Updates made while a write is in progress go out in the next one
+        while self._dirty:
+            await asyncio.sleep(WRITE_DELAY)
+            self._dirty = False
+            try:
+                async with self._lock:
+                    await self._write()
+            except Exception as e:
+                # Nobody awaits this task, so log instead of raising
+                print(f"[registry] sync error: {e}")
+
+    async def _write(self) -> None:
+        """Merge CLI tasks + web tasks and write dev-tasks.json atomically."""
+        web_tasks = list(self._web_tasks.values())
+        all_tasks = self._cli_tasks + web_tasks
+
+        # Compute meta summary
+        total_cost = sum(
+            t.get("cost_usd") or 0 for t in all_tasks
+        )
+        meta = {
+            "last_synced_at": datetime.now().isoformat(),
+            "total_cost_usd": round(total_cost, 6),
+            "cli_tasks": len(self._cli_tasks),
+            "web_tasks": len(web_tasks),
+        }
 
-            output = {"meta": meta, "tasks": all_tasks}
+        output = {"meta": meta, "tasks": all_tasks}
 
-            # Atomic write: write to temp file then os.replace
-            await asyncio.to_thread(self._atomic_write, output)
+        # Atomic write: write to temp file then os.replace
+        await asyncio.to_thread(self._atomic_write, output)
 
     def _atomic_write(self, data: dict) -> None:
         """Write JSON atomically using tmp file + os.replace."""
@@ -90,9 +150,8 @@ class TaskRegistry:
         os.makedirs(dir_name, exist_ok=True)
         fd, tmp_path = tempfile.mkstemp(dir=dir_name, suffix=".tmp")
         try:
-            with os.fdopen(fd, "w") as f:
-                json.dump(data, f, indent=2)
-                f.write("\n")
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
             os.replace(tmp_path, self.registry_path)
         except Exception:
             # Clean up temp file on failure
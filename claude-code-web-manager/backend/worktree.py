@@ -1,22 +1,46 @@
 import asyncio
 import shutil
+import weakref
 from pathlib import Path
 from typing import Optional
 
+# `git worktree` subcommands that rewrite .git/worktrees.  Run concurrently
+# against one repository they race (e.g. "failed to read .../commondir"),
+# so they are serialized per repository; everything else runs in parallel.
+_WORKTREE_ADMIN = frozenset({"add", "move", "remove", "prune"})
+
+# event loop -> repository path -> lock
+_admin_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Lock]]" = (
+    weakref.WeakKeyDictionary()
+)
+
 
 class WorktreeError(Exception):
     """Raised when a git worktree operation fails."""
     pass
 
 
+def _admin_lock(repo: str) -> asyncio.Lock:
+    locks = _admin_locks.setdefault(asyncio.get_running_loop(), {})
+    return locks.setdefault(repo, asyncio.Lock())
+
+
 async def _run_git(
     *args: str,
     cwd: str,
 ) -> tuple[str, str, int]:
-    """Run a git command and return (stdout, stderr, returncode)."""
+    """Run a git command in `cwd` and return (stdout, stderr, returncode)."""
+    if args[:1] == ("worktree",) and args[1:2] and args[1] in _WORKTREE_ADMIN:
+        async with _admin_lock(cwd):
+            return await _exec_git(*args, cwd=cwd)
+    return await _exec_git(*args, cwd=cwd)
+
+
+async def _exec_git(*args: str, cwd: str) -> tuple[str, str, int]:
+    # `git -C` instead of cwd=: git changes directory itself, so the child
+    # skips a chdir between fork and exec.
     proc = await asyncio.create_subprocess_exec(
-        "git", *args,
-        cwd=cwd,
+        "git", "-C", cwd, *args,
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE,
     )
@@ -24,6 +48,15 @@ async def _run_git(
     return stdout.decode(), stderr.decode(), proc.returncode
 
 
+async def _rmtree(path: str) -> None:
+    """Delete a directory tree on a worker thread.
+
+    Worktrees can hold tens of thousands of files (.venv, node_modules), and
+    deleting them inline would block the event loop for seconds.
+    """
+    await asyncio.to_thread(shutil.rmtree, path, ignore_errors=True)
+
+
 async def create_worktree(
     base_repo: str,
     branch: str,
@@ -67,6 +100,94 @@ async def create_worktree(
     return path
 
 
+async def create_detached_worktree(
+    base_repo: str,
+    path: str,
+) -> str:
+    """Create a spare worktree at base_repo's HEAD with no branch checked out.
+
+    Spare worktrees are created ahead of time and later turned into task
+    worktrees with claim_worktree().
+
+    Args:
+        base_repo: Path to the main git repository.
+        path: Filesystem path for the worktree.
+
+    Returns:
+        The worktree path on success.
+
+    Raises:
+        WorktreeError: If the git worktree command fails.
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    stdout, stderr, rc = await _run_git(
+        "worktree", "add", "--detach", path,
+        cwd=base_repo,
+    )
+    if rc != 0:
+        raise WorktreeError(f"worktree creation failed: {stderr.strip()}")
+    return path
+
+
+async def claim_worktree(
+    base_repo: str,
+    spare_path: str,
+    branch: str,
+    path: str,
+) -> str:
+    """Turn a spare detached worktree into a task worktree on a new branch.
+
+    The spare is moved to `path` and `branch` is created there at base_repo's
+    current HEAD.  Only files that differ between the spare's commit and HEAD
+    are rewritten, so on a large tree this is much cheaper than
+    create_worktree().
+
+    Args:
+        base_repo: Path to the main git repository.
+        spare_path: Path of a worktree made by create_detached_worktree().
+        branch: Branch name to create.
+        path: Filesystem path the task's worktree should live at.
+
+    Returns:
+        The worktree path on success.
+
+    Raises:
+        WorktreeError: If any step fails.  The spare has been removed then;
+            fall back to create_worktree().
+    """
+    if Path(path).exists():
+        # `worktree move` would nest the spare inside a leftover directory;
+        # create_worktree() knows how to clean up stale task paths.
+        await remove_worktree(base_repo, spare_path)
+        raise WorktreeError(f"worktree move failed: {path} already exists")
+
+    head, stderr, rc = await _run_git("rev-parse", "HEAD", cwd=base_repo)
+    if rc != 0:
+        await remove_worktree(base_repo, spare_path)
+        raise WorktreeError(f"could not resolve HEAD: {stderr.strip()}")
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    stdout, stderr, rc = await _run_git(
+        "worktree", "move", spare_path, path,
+        cwd=base_repo,
+    )
+    if rc != 0:
+        # The spare is still registered at its old path; don't leak it
+        await remove_worktree(base_repo, spare_path)
+        raise WorktreeError(f"worktree move failed: {stderr.strip()}")
+
+    stdout, stderr, rc = await _run_git(
+        "switch", "-c", branch, head.strip(),
+        cwd=path,
+    )
+    if rc != 0:
+        # Don't leave a detached worktree squatting on the task's path
+        await remove_worktree(base_repo, path)
+        raise WorktreeError(f"branch creation failed: {stderr.strip()}")
+    return path
+
+
 async def _cleanup_stale_branch(
     base_repo: str,
     branch: str,
@@ -79,7 +200,7 @@ async def _cleanup_stale_branch(
     """
     # Remove the worktree directory if it still exists
     if Path(path).exists():
-        shutil.rmtree(path, ignore_errors=True)
+        await _rmtree(path)
 
     # Prune worktree records that point to missing directories
     await _run_git("worktree", "prune", cwd=base_repo)
@@ -111,7 +232,7 @@ async def remove_worktree(
     if rc != 0:
         # Fallback: prune + manual removal if the worktree is already gone
         if Path(path).exists():
-            shutil.rmtree(path, ignore_errors=True)
+            await _rmtree(path)
         await _run_git("worktree", "prune", cwd=base_repo)
 
 
@@ -153,24 +274,27 @@ async def cleanup_branch(
 async def list_worktrees(base_repo: str) -> list[str]:
     """List all worktree paths for a repository.
 
+    The porcelain output is read line by line and matched as bytes; only
+    the `worktree <path>` lines are decoded.
+
     Args:
         base_repo: Path to the main git repository.
 
     Returns:
         List of worktree paths (excluding the main worktree).
     """
-    stdout, stderr, rc = await _run_git(
-        "worktree", "list", "--porcelain",
-        cwd=base_repo,
+    proc = await asyncio.create_subprocess_exec(
+        "git", "-C", base_repo, "worktree", "list", "--porcelain",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
     )
-    if rc != 0:
-        return []
-
     paths = []
-    for line in stdout.splitlines():
-        if line.startswith("worktree "):
-            wt_path = line[len("worktree "):]
+    async for raw in proc.stdout:
+        if raw.startswith(b"worktree "):
+            wt_path = raw[len(b"worktree "):].rstrip(b"\n").decode()
             # Skip the main worktree (it's the base_repo itself)
             if wt_path != base_repo:
                 paths.append(wt_path)
+    if await proc.wait() != 0:
+        return []
     return paths
@@ -0,0 +1,223 @@
+"""
+Shared Playwright fixtures for the E2E suite.
+
+One Chromium instance is launched per session.  The `page` fixture is a
+single page shared by the whole session: open_app() loads the SPA once and
+afterwards resets it in place.  It doesn't load images or fonts.  Tests
+that need fresh cookies/storage or full rendering can use the per-test
+`context` fixture instead.
+
+The suite can run in parallel (``pytest tests/e2e/ -n auto``) against one
+backend.  Each xdist worker prefixes its task titles with WORKER_PREFIX and
+only counts, clicks and cleans up cards carrying that prefix.
+"""
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+HOST, PORT = "localhost", 8000
+BASE_URL = f"http://{HOST}:{PORT}"
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SERVER_START_TIMEOUT = 30
+
+# Not loaded by the shared page (see _shared_page)
+BLOCKED_ASSETS = "**/*.{png,jpg,jpeg,gif,svg,ico,woff,woff2,ttf}"
+
+WORKER_PREFIX = f"[{os.environ.get('PYTEST_XDIST_WORKER', 'gw0')}] "
+
+# Task cards created by this worker
+TASK_CARD = f".task-card:has-text('{WORKER_PREFIX}')"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--screenshots", action="store_true", default=False,
+        help="also run tests marked 'screenshot' (visual-review artifacts)",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--screenshots", default=False):
+        return
+    skip = pytest.mark.skip(reason="needs --screenshots")
+    for item in items:
+        if "screenshot" in item.keywords:
+            item.add_marker(skip)
+
+
+def _server_healthy() -> bool:
+    try:
+        with urllib.request.urlopen(f"{BASE_URL}/api/health", timeout=1) as resp:
+            return resp.status == 200
+    except OSError:
+        return False
+
+
+@pytest.fixture(scope="session", autouse=True)
+def backend(tmp_path_factory):
+    """Start uvicorn once for the session unless a server is already running.
+
+    Yields the server's SQLite path when this fixture started it (on a
+    fresh DB and registry file under a temp dir), or None for a server that
+    was already running.
+
+    For parallel runs, start the server yourself first so that no worker
+    stops it while the others are still using it.
+    """
+    with socket.socket() as sock:
+        if sock.connect_ex((HOST, PORT)) == 0:
+            yield None
+            return
+
+    tmp = tmp_path_factory.mktemp("backend")
+    db_path = tmp / "tasks.db"
+    env = {
+        **os.environ,
+        "DB_PATH": str(db_path),
+        "REGISTRY_PATH": str(tmp / "dev-tasks.json"),
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(PORT)],
+        cwd=PROJECT_ROOT,
+        env=env,
+    )
+    try:
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while not _server_healthy():
+            if proc.poll() is not None or time.monotonic() > deadline:
+                pytest.exit("backend server failed to start", returncode=1)
+            time.sleep(0.2)
+        yield db_path
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def delete_worker_tasks(db_path) -> None:
+    """Delete this worker's tasks straight from the backend's SQLite file.
+
+    Logs and plans go with them through ON DELETE CASCADE.
+    """
+    conn = sqlite3.connect(db_path, timeout=5)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        with conn:
+            conn.execute(
+                "DELETE FROM tasks WHERE substr(title, 1, ?) = ?",
+                (len(WORKER_PREFIX), WORKER_PREFIX),
+            )
+    finally:
+        conn.close()
+
+
+@pytest.fixture(scope="session")
+def browser_context_args(browser_context_args):
+    return {**browser_context_args, "base_url": BASE_URL}
+
+
+@pytest.fixture(scope="session")
+def api(playwright, backend):
+    """API client for test setup/cleanup, independent of any page."""
+    ctx = playwright.request.new_context(base_url=BASE_URL)
+    yield ctx
+    ctx.dispose()
+
+
+@pytest.fixture(scope="session")
+def browser(playwright):
+    browser = playwright.chromium.launch(
+        headless=True,
+        args=["--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu", "--disable-extensions"],
+    )
+    yield browser
+    browser.close()
+
+
+@pytest.fixture
+def context(browser, browser_context_args):
+    ctx = browser.new_context(**browser_context_args)
+    yield ctx
+    ctx.close()
+
+
+# The kanban board's /ws connection, per page
+_board_sockets = {}
+
+
+@pytest.fixture(scope="session")
+def _shared_page(browser, browser_context_args):
+    ctx = browser.new_context(**browser_context_args)
+    # Tests assert on the DOM only, so skip images and fonts
+    ctx.route(BLOCKED_ASSETS, lambda route: route.abort())
+    page = ctx.new_page()
+
+    def on_websocket(ws):
+        if ws.url.endswith("/ws"):
+            _board_sockets[page] = ws
+
+    page.on("websocket", on_websocket)
+    yield page
+    ctx.close()
+
+
+@pytest.fixture
+def page(_shared_page):
+    """One page for the whole session; see open_app()."""
+    return _shared_page
+
+
+def open_app(page) -> None:
+    """Show the board with current server state.
+
+    The first call loads the app.  Later calls reset the already-loaded SPA
+    through its window.__resetStore hook, which closes the side panel and
+    refetches tasks, instead of reloading the bundle and reconnecting the
+    WebSocket.
+    """
+    if page.url.startswith(BASE_URL):
+        page.evaluate("() => window.__resetStore()")
+    else:
+        page.goto(BASE_URL)
+
+
+def wait_for_task_count(page, count: int, timeout: float = 5000) -> None:
+    """Wait until the app's task store holds `count` of this worker's tasks.
+
+    Checks window.__store once per animation frame rather than running a
+    CSS selector on every poll.
+    """
+    page.wait_for_function(
+        "([prefix, count]) => (window.__store?.tasks ?? [])"
+        ".filter(t => t.title.startsWith(prefix)).length === count",
+        arg=[WORKER_PREFIX, count],
+        timeout=timeout,
+    )
+
+
+def board_socket(page):
+    """The page's kanban /ws connection (the app must be open)."""
+    return _board_sockets[page]
+
+
+def task_event(task_ids: list[int], event_type: str):
+    """framereceived predicate matching an `event_type` broadcast for any of
+    task_ids.
+
+    task_ids may be filled in after the wait has started, so a task can be
+    created inside the `expect_event` block without missing early events.
+    """
+    def matches(payload) -> bool:
+        # Each frame is a JSON array of coalesced broadcasts
+        return any(
+            msg.get("task_id") in task_ids and msg.get("type") == event_type
+            for msg in json.loads(payload)
+        )
+    return matches
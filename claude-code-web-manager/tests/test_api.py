@@ -1,6 +1,5 @@
 import asyncio
-import os
-import tempfile
+import json
 import pytest
 import pytest_asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -12,46 +11,82 @@ from backend.database import Database
 from backend.models import TaskStatus
 
 
-@pytest_asyncio.fixture
-async def app_with_db():
-    """Set up a test FastAPI app instance with a temporary DB."""
-    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
-        db_path = f.name
+class _StubScheduler:
+    """Stands in for TaskScheduler; records wake() calls."""
+
+    def __init__(self):
+        self.wakes = 0
+
+    async def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def wake(self):
+        self.wakes += 1
+
+    async def cancel_task(self, *args, **kwargs):
+        pass
+
+
+class _StubRegistry:
+    """Stands in for TaskRegistry, keeping the real dev-tasks.json (and its
+    debounced background writes) out of API tests."""
+
+    async def sync(self, *args, **kwargs):
+        pass
+
+    async def update(self, *args, **kwargs):
+        pass
+
+    async def flush(self):
+        pass
 
-    test_db = Database(db_path)
-    await test_db.init()
 
-    # Patch the global db and scheduler in main module
-    mock_scheduler = MagicMock()
-    mock_scheduler.start = AsyncMock(return_value=None)
-    mock_scheduler.stop = MagicMock()
-    mock_scheduler.cancel_task = AsyncMock()
+# The app, DB and client are set up once and shared by every test here, so
+# tests (and their fixtures) run on the session event loop
+pytestmark = pytest.mark.asyncio(loop_scope="session")
 
-    original_db = main_module.db
-    original_scheduler = main_module.scheduler
 
-    main_module.db = test_db
-    main_module.scheduler = mock_scheduler
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def _session_app():
+    """Point the app at an in-memory DB and stub registry, once.
 
-    # Temporarily clear API_KEY for auth-skipping
-    original_api_key = main_module.API_KEY
-    main_module.API_KEY = ""
+    An in-memory DB is private to its connection, so each xdist worker
+    (``pytest -n auto``) gets its own.
+    """
+    test_db = Database(":memory:")
+    await test_db.init()
+
+    # Session-scoped, so pytest's monkeypatch fixture isn't available here;
+    # the context undoes every setattr on exit.
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(main_module, "db", test_db)
+        mp.setattr(main_module, "registry", _StubRegistry())
+        # Clear API_KEY for auth-skipping
+        mp.setattr(main_module, "API_KEY", "")
 
-    # We need the app to run lifespan but without the real scheduler loop
-    # Patch asyncio.create_task to avoid background tasks in tests
-    with patch("backend.main.asyncio.create_task", return_value=MagicMock()):
-        from httpx import AsyncClient, ASGITransport
         transport = ASGITransport(app=main_module.app)
         async with AsyncClient(transport=transport, base_url="http://test") as client:
-            # Manually init db (lifespan won't run in TestClient)
-            await test_db.init()
             yield client, test_db
 
-    main_module.db = original_db
-    main_module.scheduler = original_scheduler
-    main_module.API_KEY = original_api_key
     await test_db.close()
-    os.unlink(db_path)
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def app_with_db(_session_app, monkeypatch):
+    """The shared app, with an empty DB and a fresh scheduler stub.
+
+    Database methods commit after every write, so a test can't be wrapped
+    in a transaction and rolled back; instead every row is deleted (logs
+    and plans cascade) and AUTOINCREMENT restarts, as in a fresh DB.
+    """
+    client, test_db = _session_app
+    monkeypatch.setattr(main_module, "scheduler", _StubScheduler())
+    yield client, test_db
+
+    await test_db._conn.executescript("DELETE FROM tasks; DELETE FROM sqlite_sequence;")
 
 
 @pytest.fixture
@@ -59,6 +94,18 @@ def client_and_db(app_with_db):
     return app_with_db
 
 
+@pytest.fixture
+def make_task(app_with_db):
+    """Create a task through the API and return its id."""
+    client, _ = app_with_db
+
+    async def _make_task(**fields):
+        r = await client.post("/api/tasks", json={"title": "T", "prompt": "p", **fields})
+        assert r.status_code == 201
+        return r.json()["id"]
+    return _make_task
+
+
 # ── Health ────────────────────────────────────────────────────────────────────
 
 async def test_health(app_with_db):
@@ -113,10 +160,9 @@ async def test_list_tasks(app_with_db):
     assert len(resp.json()) == 2
 
 
-async def test_list_tasks_filter_by_status(app_with_db):
+async def test_list_tasks_filter_by_status(app_with_db, make_task):
     client, db = app_with_db
-    r = await client.post("/api/tasks", json={"title": "T1", "prompt": "p"})
-    task_id = r.json()["id"]
+    task_id = await make_task(title="T1")
     await db.update_task(task_id, status=TaskStatus.COMPLETED)
 
     resp = await client.get("/api/tasks?status=completed")
@@ -128,10 +174,9 @@ async def test_list_tasks_filter_by_status(app_with_db):
 
 # ── Get task ──────────────────────────────────────────────────────────────────
 
-async def test_get_task(app_with_db):
+async def test_get_task(app_with_db, make_task):
     client, db = app_with_db
-    r = await client.post("/api/tasks", json={"title": "Fetch me", "prompt": "p"})
-    task_id = r.json()["id"]
+    task_id = await make_task(title="Fetch me")
     resp = await client.get(f"/api/tasks/{task_id}")
     assert resp.status_code == 200
     data = resp.json()
@@ -139,18 +184,11 @@ async def test_get_task(app_with_db):
     assert data["logs"] == []
 
 
-async def test_get_task_not_found(app_with_db):
-    client, db = app_with_db
-    resp = await client.get("/api/tasks/99999")
-    assert resp.status_code == 404
-
-
 # ── Get task logs ─────────────────────────────────────────────────────────────
 
-async def test_get_task_logs(app_with_db):
+async def test_get_task_logs(app_with_db, make_task):
     client, db = app_with_db
-    r = await client.post("/api/tasks", json={"title": "Log test", "prompt": "p"})
-    task_id = r.json()["id"]
+    task_id = await make_task(title="Log test")
     await db.add_log(task_id, "info", "step 1", raw_output="raw1")
     resp = await client.get(f"/api/tasks/{task_id}/logs")
     assert resp.status_code == 200
@@ -159,36 +197,22 @@ async def test_get_task_logs(app_with_db):
     assert logs[0]["message"] == "step 1"
 
 
-async def test_get_task_logs_not_found(app_with_db):
-    client, db = app_with_db
-    resp = await client.get("/api/tasks/99999/logs")
-    assert resp.status_code == 404
-
-
 # ── Cancel task ───────────────────────────────────────────────────────────────
 
-async def test_cancel_task(app_with_db):
+async def test_cancel_task(app_with_db, make_task):
     client, db = app_with_db
-    r = await client.post("/api/tasks", json={"title": "Cancel me", "prompt": "p"})
-    task_id = r.json()["id"]
+    task_id = await make_task(title="Cancel me")
     resp = await client.post(f"/api/tasks/{task_id}/cancel")
     assert resp.status_code == 200
     updated = await db.get_task(task_id)
     assert updated.status == TaskStatus.CANCELLED
 
 
-async def test_cancel_task_not_found(app_with_db):
-    client, db = app_with_db
-    resp = await client.post("/api/tasks/99999/cancel")
-    assert resp.status_code == 404
-
-
 # ── Retry task ────────────────────────────────────────────────────────────────
 
-async def test_retry_task(app_with_db):
+async def test_retry_task(app_with_db, make_task):
     client, db = app_with_db
-    r = await client.post("/api/tasks", json={"title": "Retry", "prompt": "p"})
-    task_id = r.json()["id"]
+    task_id = await make_task(title="Retry")
     await db.update_task(task_id, status=TaskStatus.FAILED, error="oops")
     resp = await client.post(f"/api/tasks/{task_id}/retry")
     assert resp.status_code == 200
@@ -197,18 +221,11 @@ async def test_retry_task(app_with_db):
     assert updated.error is None
 
 
-async def test_retry_task_not_found(app_with_db):
-    client, db = app_with_db
-    resp = await client.post("/api/tasks/99999/retry")
-    assert resp.status_code == 404
-
-
 # ── Approve plan ──────────────────────────────────────────────────────────────
 
-async def test_approve_plan(app_with_db):
+async def test_approve_plan(app_with_db, make_task):
     client, db = app_with_db
-    r = await client.post("/api/tasks", json={"title": "Plan", "prompt": "p", "mode": "plan"})
-    task_id = r.json()["id"]
+    task_id = await make_task(title="Plan", mode="plan")
     # Set plan text and status to review (as scheduler would)
     await db.update_task(task_id, status=TaskStatus.REVIEW, plan="Step 1\nStep 2")
     resp = await client.post(f"/api/tasks/{task_id}/approve-plan")
@@ -223,10 +240,9 @@ async def test_approve_plan(app_with_db):
 
 # ── Reject plan ──────────────────────────────────────────────────────────────
 
-async def test_reject_plan(app_with_db):
+async def test_reject_plan(app_with_db, make_task):
     client, db = app_with_db
-    r = await client.post("/api/tasks", json={"title": "Plan", "prompt": "original prompt", "mode": "plan"})
-    task_id = r.json()["id"]
+    task_id = await make_task(title="Plan", prompt="original prompt", mode="plan")
     await db.update_task(task_id, status=TaskStatus.REVIEW, plan="Bad plan")
     resp = await client.post(
         f"/api/tasks/{task_id}/reject-plan",
@@ -242,18 +258,11 @@ async def test_reject_plan(app_with_db):
     assert updated.plan is None
 
 
-async def test_reject_plan_not_found(app_with_db):
-    client, db = app_with_db
-    resp = await client.post("/api/tasks/99999/reject-plan", json={"feedback": "bad"})
-    assert resp.status_code == 404
-
-
 # ── Plan history ─────────────────────────────────────────────────────────────
 
-async def test_task_detail_includes_plans(app_with_db):
+async def test_task_detail_includes_plans(app_with_db, make_task):
     client, db = app_with_db
-    r = await client.post("/api/tasks", json={"title": "Plan", "prompt": "p", "mode": "plan"})
-    task_id = r.json()["id"]
+    task_id = await make_task(title="Plan", mode="plan")
     await db.add_plan(task_id, "Plan v1")
     await db.add_plan(task_id, "Plan v2")
 
@@ -268,53 +277,73 @@ async def test_task_detail_includes_plans(app_with_db):
 
 # ── Delete task ───────────────────────────────────────────────────────────────
 
-async def test_delete_task(app_with_db):
+async def test_delete_task(app_with_db, make_task):
     client, db = app_with_db
-    r = await client.post("/api/tasks", json={"title": "Delete me", "prompt": "p"})
-    task_id = r.json()["id"]
+    task_id = await make_task(title="Delete me")
     resp = await client.delete(f"/api/tasks/{task_id}")
     assert resp.status_code == 200
     assert await db.get_task(task_id) is None
 
 
-async def test_delete_task_not_found(app_with_db):
+async def test_delete_tasks_batch(app_with_db):
+    client, db = app_with_db
+    r = await client.post("/api/tasks/batch", json=[
+        {"title": "D1", "prompt": "p"},
+        {"title": "D2", "prompt": "p"},
+        {"title": "Keep", "prompt": "p"},
+    ])
+    d1, d2, keep = (t["id"] for t in r.json())
+    resp = await client.post("/api/tasks/batch-delete", json={"ids": [d1, d2, 99999]})
+    assert resp.status_code == 200
+    assert resp.json()["deleted"] == 2
+    assert [t.id for t in await db.list_tasks()] == [keep]
+
+
+# ── Unknown task ids ──────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("method,url,body", [
+    ("GET", "/api/tasks/99999", None),
+    ("GET", "/api/tasks/99999/logs", None),
+    ("POST", "/api/tasks/99999/cancel", None),
+    ("POST", "/api/tasks/99999/retry", None),
+    ("POST", "/api/tasks/99999/reject-plan", {"feedback": "bad"}),
+    ("DELETE", "/api/tasks/99999", None),
+])
+async def test_task_not_found(app_with_db, method, url, body):
     client, db = app_with_db
-    resp = await client.delete("/api/tasks/99999")
+    resp = await client.request(method, url, json=body)
     assert resp.status_code == 404
 
 
 # ── API Key auth ──────────────────────────────────────────────────────────────
 
-async def test_auth_required_when_api_key_set(app_with_db):
+async def test_auth_required_when_api_key_set(app_with_db, monkeypatch):
     client, db = app_with_db
-    original_key = main_module.API_KEY
-    main_module.API_KEY = "secret-key"
-    try:
-        resp = await client.post("/api/tasks", json={"title": "T", "prompt": "p"})
-        assert resp.status_code == 401
-
-        resp2 = await client.post(
-            "/api/tasks",
-            json={"title": "T", "prompt": "p"},
-            headers={"x-api-key": "secret-key"},
-        )
-        assert resp2.status_code == 201
-    finally:
-        main_module.API_KEY = original_key
+    monkeypatch.setattr(main_module, "API_KEY", "secret-key")
+    resp = await client.post("/api/tasks", json={"title": "T", "prompt": "p"})
+    assert resp.status_code == 401
+
+    resp2 = await client.post(
+        "/api/tasks",
+        json={"title": "T", "prompt": "p"},
+        headers={"x-api-key": "secret-key"},
+    )
+    assert resp2.status_code == 201
 
 
 # ── Side panel data tests ────────────────────────────────────────────────────
 
-async def test_get_task_detail_includes_multiple_logs(app_with_db):
+async def test_get_task_detail_includes_multiple_logs(app_with_db, make_task):
     """GET /api/tasks/{id} returns task with multiple log entries, as the
     side panel needs to render the full log history."""
     client, db = app_with_db
-    r = await client.post("/api/tasks", json={"title": "Multi-log", "prompt": "p"})
-    task_id = r.json()["id"]
-    await db.add_log(task_id, "info", "Starting task")
-    await db.add_log(task_id, "info", "Processing step 1")
-    await db.add_log(task_id, "error", "Something failed")
-    await db.add_log(task_id, "info", "Retrying step 1")
+    task_id = await make_task(title="Multi-log")
+    await db.add_logs_bulk([
+        (task_id, "info", "Starting task", None),
+        (task_id, "info", "Processing step 1", None),
+        (task_id, "error", "Something failed", None),
+        (task_id, "info", "Retrying step 1", None),
+    ])
 
     resp = await client.get(f"/api/tasks/{task_id}")
     assert resp.status_code == 200
@@ -328,12 +357,11 @@ async def test_get_task_detail_includes_multiple_logs(app_with_db):
     assert logs[2]["level"] == "error"
 
 
-async def test_get_task_detail_with_token_cost_data(app_with_db):
+async def test_get_task_detail_with_token_cost_data(app_with_db, make_task):
     """GET /api/tasks/{id} returns token and cost fields that the side
     panel uses to display execution metrics."""
     client, db = app_with_db
-    r = await client.post("/api/tasks", json={"title": "Token test", "prompt": "p"})
-    task_id = r.json()["id"]
+    task_id = await make_task(title="Token test")
     await db.update_task(
         task_id,
         status=TaskStatus.COMPLETED,
@@ -350,12 +378,11 @@ async def test_get_task_detail_with_token_cost_data(app_with_db):
     assert task["cost_usd"] == pytest.approx(0.0042)
 
 
-async def test_get_task_detail_with_error_field(app_with_db):
+async def test_get_task_detail_with_error_field(app_with_db, make_task):
     """GET /api/tasks/{id} returns the error field for failed tasks, which
     the side panel renders in red."""
     client, db = app_with_db
-    r = await client.post("/api/tasks", json={"title": "Error test", "prompt": "p"})
-    task_id = r.json()["id"]
+    task_id = await make_task(title="Error test")
     await db.update_task(
         task_id,
         status=TaskStatus.FAILED,
@@ -369,11 +396,10 @@ async def test_get_task_detail_with_error_field(app_with_db):
     assert task["error"] == "Process exited with code 1: segfault"
 
 
-async def test_get_task_detail_with_output(app_with_db):
+async def test_get_task_detail_with_output(app_with_db, make_task):
     """GET /api/tasks/{id} returns the output field for completed tasks."""
     client, db = app_with_db
-    r = await client.post("/api/tasks", json={"title": "Output test", "prompt": "p"})
-    task_id = r.json()["id"]
+    task_id = await make_task(title="Output test")
     await db.update_task(
         task_id,
         status=TaskStatus.COMPLETED,
@@ -386,15 +412,16 @@ async def test_get_task_detail_with_output(app_with_db):
     assert task["output"] == "Task completed successfully. Created 3 files."
 
 
-async def test_get_task_logs_multiple_levels(app_with_db):
+async def test_get_task_logs_multiple_levels(app_with_db, make_task):
     """GET /api/tasks/{id}/logs returns logs with different levels that the
     side panel styles differently (log-level-info, log-level-error, etc.)."""
     client, db = app_with_db
-    r = await client.post("/api/tasks", json={"title": "Log levels", "prompt": "p"})
-    task_id = r.json()["id"]
-    await db.add_log(task_id, "info", "Started")
-    await db.add_log(task_id, "error", "Failed to clone")
-    await db.add_log(task_id, "info", "Retrying")
+    task_id = await make_task(title="Log levels")
+    await db.add_logs_bulk([
+        (task_id, "info", "Started", None),
+        (task_id, "error", "Failed to clone", None),
+        (task_id, "info", "Retrying", None),
+    ])
 
     resp = await client.get(f"/api/tasks/{task_id}/logs")
     assert resp.status_code == 200
@@ -404,12 +431,11 @@ async def test_get_task_logs_multiple_levels(app_with_db):
     assert levels == ["info", "error", "info"]
 
 
-async def test_get_task_detail_timestamps(app_with_db):
+async def test_get_task_detail_timestamps(app_with_db, make_task):
     """GET /api/tasks/{id} returns started_at and completed_at timestamps
     that the side panel conditionally displays."""
     client, db = app_with_db
-    r = await client.post("/api/tasks", json={"title": "Timestamps", "prompt": "p"})
-    task_id = r.json()["id"]
+    task_id = await make_task(title="Timestamps")
 
     # Initially, started_at and completed_at should be null
     resp = await client.get(f"/api/tasks/{task_id}")
@@ -419,12 +445,11 @@ async def test_get_task_detail_timestamps(app_with_db):
     assert task["created_at"] is not None
 
 
-async def test_cancel_then_retry_roundtrip(app_with_db):
+async def test_cancel_then_retry_roundtrip(app_with_db, make_task):
     """Cancel and retry a task via API endpoints, simulating the side panel
     cancel → retry workflow."""
     client, db = app_with_db
-    r = await client.post("/api/tasks", json={"title": "Roundtrip", "prompt": "p"})
-    task_id = r.json()["id"]
+    task_id = await make_task(title="Roundtrip")
 
     # Cancel
     resp = await client.post(f"/api/tasks/{task_id}/cancel")
@@ -481,14 +506,15 @@ async def test_side_panel_full_task_data(app_with_db):
     assert isinstance(data["logs"], list)
 
 
-async def test_delete_task_with_logs_cascades(app_with_db):
+async def test_delete_task_with_logs_cascades(app_with_db, make_task):
     """Deleting a task also removes its logs (cascade), so the side panel
     won't show stale data if a task ID is reused."""
     client, db = app_with_db
-    r = await client.post("/api/tasks", json={"title": "Cascade", "prompt": "p"})
-    task_id = r.json()["id"]
-    await db.add_log(task_id, "info", "log entry 1")
-    await db.add_log(task_id, "info", "log entry 2")
+    task_id = await make_task(title="Cascade")
+    await db.add_logs_bulk([
+        (task_id, "info", "log entry 1", None),
+        (task_id, "info", "log entry 2", None),
+    ])
 
     # Verify logs exist
     logs = await db.get_task_logs(task_id)
@@ -502,3 +528,147 @@ async def test_delete_task_with_logs_cascades(app_with_db):
     assert await db.get_task(task_id) is None
     logs_after = await db.get_task_logs(task_id)
     assert len(logs_after) == 0
+
+
+async def test_broadcast_drops_dead_connections():
+    """A client whose send fails is removed; the others still get the frame."""
+    manager = main_module.ConnectionManager()
+    alive, dead = MagicMock(), MagicMock()
+    alive.send_bytes = AsyncMock()
+    dead.send_bytes = AsyncMock(side_effect=RuntimeError("closed"))
+    dead.close = AsyncMock(side_effect=RuntimeError("closed"))
+    manager.connections = {alive, dead}
+
+    await manager.broadcast(1, {"type": "status", "status": "running"})
+    await manager._flusher
+
+    alive.send_bytes.assert_awaited_once()
+    assert manager.connections == {alive}
+    dead.close.assert_awaited_once_with(code=1011)
+
+
+async def test_broadcast_coalesces_burst_into_one_frame():
+    """Messages queued before the flusher runs share a single array frame."""
+    manager = main_module.ConnectionManager()
+    conn = MagicMock()
+    conn.send_bytes = AsyncMock()
+    manager.connections = {conn}
+
+    await manager.broadcast(1, {"type": "status", "status": "running"})
+    await manager.broadcast(1, {"type": "output", "lines": ["a"]})
+    await manager._flusher
+
+    conn.send_bytes.assert_awaited_once()
+    frame = json.loads(conn.send_bytes.call_args.args[0])
+    assert frame == [
+        {"task_id": 1, "type": "status", "status": "running"},
+        {"task_id": 1, "type": "output", "lines": ["a"]},
+    ]
+
+
+async def test_index_served_from_memory_with_etag(app_with_db):
+    """GET / returns the app shell with an ETag and honours If-None-Match."""
+    client, _ = app_with_db
+    resp = await client.get("/")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/html")
+    assert b"<html" in resp.content.lower()
+    etag = resp.headers["etag"]
+
+    cached = await client.get("/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+async def test_broadcast_drops_client_that_times_out():
+    """A stuck client is dropped and closed after SEND_TIMEOUT without delaying
+    the others."""
+    manager = main_module.ConnectionManager()
+    fast, stuck = MagicMock(), MagicMock()
+    fast.send_bytes = AsyncMock()
+
+    async def hang(frame):
+        await asyncio.Event().wait()
+
+    stuck.send_bytes = hang
+    stuck.close = AsyncMock()
+    manager.connections = {fast, stuck}
+
+    with patch.object(main_module, "SEND_TIMEOUT", 0.01):
+        await manager.broadcast(1, {"type": "status", "status": "running"})
+        await manager._flusher
+
+    fast.send_bytes.assert_awaited_once()
+    assert manager.connections == {fast}
+    # Closed so the client's reconnect logic kicks in
+    stuck.close.assert_awaited_once_with(code=1011)
+    fast.close.assert_not_called()
+
+
+async def test_create_and_retry_wake_scheduler(app_with_db):
+    """Queueing work wakes the scheduler instead of waiting for its poll."""
+    client, _ = app_with_db
+    r = await client.post("/api/tasks", json={"title": "Wake", "prompt": "p"})
+    assert main_module.scheduler.wakes == 1
+
+    await client.post(f"/api/tasks/{r.json()['id']}/retry")
+    assert main_module.scheduler.wakes == 2
+
+
+async def test_chat_session_cleaned_up_when_handler_fails():
+    """The chat subprocess is torn down even if the handler raises."""
+    session = MagicMock()
+    session.send_message = AsyncMock(side_effect=RuntimeError("boom"))
+    session.cleanup = AsyncMock()
+    ws = MagicMock()
+    ws.accept = AsyncMock()
+    ws.receive_text = AsyncMock(return_value=json.dumps({"type": "message", "text": "hi"}))
+
+    with patch.object(main_module, "ChatSession", return_value=session):
+        with pytest.raises(RuntimeError):
+            await main_module.chat_endpoint(ws)
+
+    session.cleanup.assert_awaited_once()
+
+
+async def test_chat_rejects_json_that_is_not_a_message_object():
+    """Well-formed JSON of the wrong shape gets an error, not a dropped connection."""
+    session = MagicMock()
+    session.cleanup = AsyncMock()
+    ws = MagicMock()
+    ws.accept = AsyncMock()
+    ws.send_text = AsyncMock()
+    ws.receive_text = AsyncMock(side_effect=[
+        "[1, 2]",
+        json.dumps({"type": "message", "text": 5}),
+        main_module.WebSocketDisconnect(),
+    ])
+
+    with patch.object(main_module, "ChatSession", return_value=session):
+        await main_module.chat_endpoint(ws)
+
+    sent = [json.loads(c.args[0]) for c in ws.send_text.await_args_list]
+    assert sent == [{"type": "error", "message": "Invalid message"}] * 2
+    session.cleanup.assert_awaited_once()
+
+
+async def test_chat_ignores_working_dir_that_is_not_a_string():
+    """A non-string working_dir is ignored rather than passed to os.path.isdir."""
+    session = MagicMock()
+    session.working_dir = "/repo"
+    session.send_message = AsyncMock()
+    session.cleanup = AsyncMock()
+    ws = MagicMock()
+    ws.accept = AsyncMock()
+    ws.send_text = AsyncMock()
+    ws.receive_text = AsyncMock(side_effect=[
+        json.dumps({"type": "message", "text": "x", "working_dir": [1]}),
+        main_module.WebSocketDisconnect(),
+    ])
+
+    with patch.object(main_module, "ChatSession", return_value=session):
+        await main_module.chat_endpoint(ws)
+
+    assert session.working_dir == "/repo"
+    session.send_message.assert_awaited_once()
+    assert session.send_message.await_args.kwargs["text"] == "x"
@@ -4,7 +4,8 @@ import asyncio
 import os
 import tempfile
 from backend.database import Database
-from backend.models import TaskStatus, TaskPriority
+from datetime import datetime
+from backend.models import Task, TaskStatus, TaskPriority
 
 
 @pytest_asyncio.fixture
@@ -23,6 +24,36 @@ async def test_init_idempotent(db):
     await db.init()
 
 
+async def test_init_enables_wal(db):
+    async with db._conn.execute("PRAGMA journal_mode") as cursor:
+        row = await cursor.fetchone()
+    assert row[0] == "wal"
+    async with db._conn.execute("PRAGMA busy_timeout") as cursor:
+        row = await cursor.fetchone()
+    assert row[0] == 5000
+
+
+async def test_reads_use_reader_pool_and_see_commits(db):
+    assert len(db._reader_conns) == db.read_pool_size
+    created = await db.create_task(title="T", prompt="P")
+    await db.update_task(created.id, status=TaskStatus.COMPLETED)
+    fetched = await db.get_task(created.id)
+    assert fetched.status == TaskStatus.COMPLETED
+    # Every borrowed connection was returned to the pool
+    assert db._readers.qsize() == db.read_pool_size
+
+
+async def test_in_memory_db_reads_fall_back_to_writer():
+    database = Database(":memory:")
+    await database.init()
+    try:
+        assert database._reader_conns == []
+        task = await database.create_task(title="T", prompt="P")
+        assert (await database.get_task(task.id)).title == "T"
+    finally:
+        await database.close()
+
+
 async def test_create_task(db):
     task = await db.create_task(title="Test", prompt="Do something")
     assert task.id is not None
@@ -31,6 +62,18 @@ async def test_create_task(db):
     assert task.status == TaskStatus.PENDING
 
 
+async def test_row_to_task_matches_validated_model(db):
+    created = await db.create_task(
+        title="T", prompt="P", priority="high", depends_on=[1], tags=["x"],
+    )
+    await db.update_task(created.id, status=TaskStatus.IN_PROGRESS, started_at=datetime.now())
+    fetched = await db.get_task(created.id)
+    validated = Task.model_validate(fetched.model_dump())
+    assert fetched.model_dump() == validated.model_dump()
+    assert fetched.status is TaskStatus.IN_PROGRESS
+    assert isinstance(fetched.started_at, datetime)
+
+
 async def test_get_task(db):
     created = await db.create_task(title="T1", prompt="P1")
     fetched = await db.get_task(created.id)
@@ -100,11 +143,69 @@ async def test_get_next_pending_task_priority_ordering(db):
     assert next_task.id == low.id
 
 
+async def test_migrates_priority_rank_on_existing_db(tmp_path):
+    import sqlite3
+    db_path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, "
+        "prompt TEXT NOT NULL, status TEXT DEFAULT 'pending', priority TEXT DEFAULT 'medium', "
+        "depends_on TEXT DEFAULT '[]', tags TEXT DEFAULT '[]', "
+        "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    )
+    conn.execute("CREATE INDEX idx_tasks_priority ON tasks(priority, created_at)")
+    conn.execute("INSERT INTO tasks (title, prompt, priority) VALUES ('low', 'p', 'low')")
+    conn.execute("INSERT INTO tasks (title, prompt, priority) VALUES ('urgent', 'p', 'urgent')")
+    conn.commit()
+    conn.close()
+
+    database = Database(db_path)
+    await database.init()
+    try:
+        task = await database.get_next_pending_task()
+        assert task.title == "urgent"
+    finally:
+        await database.close()
+
+
 async def test_get_next_pending_task_none_when_empty(db):
     result = await db.get_next_pending_task()
     assert result is None
 
 
+async def test_get_next_pending_task_exclude_ids(db):
+    urgent = await db.create_task(title="urgent", prompt="p", priority="urgent")
+    high = await db.create_task(title="high", prompt="p", priority="high")
+    next_task = await db.get_next_pending_task(exclude_ids=[urgent.id])
+    assert next_task.id == high.id
+    assert await db.get_next_pending_task(exclude_ids=[urgent.id, high.id]) is None
+
+
+async def test_create_tasks_bulk(db):
+    specs = [
+        {"title": f"T{i}", "prompt": "p", "priority": "high", "tags": [f"t{i}"]}
+        for i in range(250)
+    ]
+    specs[1]["depends_on"] = [1]
+    created = await db.create_tasks_bulk(specs)
+
+    assert [t.title for t in created] == [s["title"] for s in specs]
+    assert [t.id for t in created] == sorted(t.id for t in created)
+    assert created[1].depends_on == [1]
+    assert created[2].tags == ["t2"]
+    assert created[0].priority == TaskPriority.HIGH
+    assert len(await db.list_tasks()) == 250
+
+
+async def test_create_tasks_bulk_is_all_or_nothing(db):
+    with pytest.raises(Exception):
+        await db.create_tasks_bulk([
+            {"title": "ok", "prompt": "p"},
+            {"title": None, "prompt": "p"},
+        ])
+    assert await db.list_tasks() == []
+
+
 async def test_add_log(db):
     task = await db.create_task(title="T", prompt="P")
     await db.add_log(task.id, "info", "step 1 done", raw_output="raw1")
@@ -117,6 +218,17 @@ async def test_add_log(db):
     assert logs[1].level == "error"
 
 
+async def test_add_logs_bulk(db):
+    task = await db.create_task(title="T", prompt="P")
+    await db.add_logs_bulk([
+        (task.id, "info", "line 1", "raw1"),
+        (task.id, "info", "line 2", None),
+    ])
+    logs = await db.get_task_logs(task.id)
+    assert [log.message for log in logs] == ["line 1", "line 2"]
+    assert logs[0].raw_output == "raw1"
+
+
 async def test_get_task_logs(db):
     task = await db.create_task(title="T", prompt="P")
     logs = await db.get_task_logs(task.id)
@@ -141,15 +253,16 @@ async def test_startup_recovery_resets_in_progress_to_pending(db):
     await db.update_task(t1.id, status=TaskStatus.IN_PROGRESS)
     await db.update_task(t2.id, status=TaskStatus.IN_PROGRESS)
 
-    # Recovery logic (same as _recover_stuck_tasks in main.py)
-    stuck = await db.list_tasks(status=TaskStatus.IN_PROGRESS)
-    for task in stuck:
-        await db.update_task(task.id, status=TaskStatus.PENDING, worker_pid=None)
+    await db.create_task(title="T3", prompt="P3")
+    await db.update_task(t1.id, worker_pid=4321)
 
+    assert await db.bulk_reset_stuck() == 2
+
+    assert (await db.get_task(t1.id)).worker_pid is None
     after = await db.list_tasks(status=TaskStatus.IN_PROGRESS)
     assert len(after) == 0
     pending = await db.list_tasks(status=TaskStatus.PENDING)
-    assert len(pending) == 2
+    assert len(pending) == 3
 
 
 async def test_create_task_with_depends_on_and_tags(db):
@@ -160,3 +273,18 @@ async def test_create_task_with_depends_on_and_tags(db):
     fetched = await db.get_task(t2.id)
     assert fetched.depends_on == [t1.id]
     assert fetched.tags == ["feature", "backend"]
+
+
+async def test_dependencies_met(db):
+    t1 = await db.create_task(title="T1", prompt="P")
+    t2 = await db.create_task(title="T2", prompt="P")
+    t3 = await db.create_task(title="T3", prompt="P", depends_on=[t1.id, t2.id])
+    t4 = await db.create_task(title="T4", prompt="P", depends_on=[99999])
+    assert await db.dependencies_met(t1.id)
+    assert not await db.dependencies_met(t3.id)
+    await db.update_task(t1.id, status=TaskStatus.COMPLETED)
+    assert not await db.dependencies_met(t3.id)
+    await db.update_task(t2.id, status=TaskStatus.COMPLETED)
+    assert await db.dependencies_met(t3.id)
+    # Missing dependency never counts as met
+    assert not await db.dependencies_met(t4.id)
@@ -1,12 +1,14 @@
 import asyncio
 import json
 import os
+import signal
 import tempfile
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
+import orjson
 import pytest
 
-from backend.executor import ClaudeCodeExecutor
+from backend.executor import ClaudeCodeExecutor, WORKER_NICE, _deprioritize, read_line
 from backend.models import Task, TaskStatus, TaskMode, TaskPriority
 from backend.worktree import WorktreeError
 from datetime import datetime
@@ -65,7 +67,7 @@ def make_result_event(result="", input_tokens=100, output_tokens=50, cost=0.001)
 
 
 class FakeStdout:
-    """Mock stdout that supports `.read(n)` returning chunks then b""."""
+    """Mock stream that supports `.read(n)` returning chunks then b""."""
 
     def __init__(self, data: bytes):
         self._data = data
@@ -83,17 +85,24 @@ class FakeStdout:
 class FakeProcess:
     """Minimal asyncio.subprocess.Process mock."""
 
-    def __init__(self, stdout_lines: list[str], returncode: int = 0, stderr: str = ""):
+    def __init__(
+        self,
+        stdout_lines: list[str],
+        returncode: int = 0,
+        stderr: str = "",
+        limit: int = 2**16,
+    ):
         self.returncode = returncode
         self.pid = 12345
         self._stdout_lines = stdout_lines
         self._stderr = stderr.encode()
-        # Build raw bytes: each line terminated by \n, as NDJSON would be
-        self.stdout = FakeStdout(
+        # Real StreamReader fed with NDJSON: each line terminated by \n
+        self.stdout = asyncio.StreamReader(limit=limit)
+        self.stdout.feed_data(
             b"".join((line + "\n").encode() for line in stdout_lines)
         )
-        self.stderr = AsyncMock()
-        self.stderr.read = AsyncMock(return_value=self._stderr)
+        self.stdout.feed_eof()
+        self.stderr = FakeStdout(self._stderr)
 
     async def communicate(self):
         stdout = b"\n".join(l.encode() for l in self._stdout_lines)
@@ -106,6 +115,13 @@ class FakeProcess:
         pass
 
 
+@pytest.fixture(autouse=True)
+def no_deprioritize():
+    """FakeProcess pids are made up; never renice a real process."""
+    with patch("backend.executor._deprioritize") as mock:
+        yield mock
+
+
 @pytest.fixture
 def tmp_log_dir(tmp_path):
     return str(tmp_path / "task-logs")
@@ -178,6 +194,21 @@ async def test_execute_task_writes_log_file(executor, tmp_log_dir):
     assert '"type": "system"' in content or '"type":"system"' in content
 
 
+async def test_log_file_is_byte_exact_across_batches(executor, tmp_log_dir):
+    """Output spanning several log batches is written in full and in order."""
+    ndjson_lines = [make_assistant_event(f"line {i} " + "z" * 1000) for i in range(200)]
+    ndjson_lines.append(make_result_event(result="done"))
+    fake_proc = FakeProcess(stdout_lines=ndjson_lines, returncode=0)
+
+    with patch("backend.executor.create_worktree", new_callable=AsyncMock), \
+         patch("asyncio.create_subprocess_exec", return_value=fake_proc), \
+         patch("backend.executor.shutil.which", return_value="/usr/bin/claude"):
+        await executor.execute_task(make_task(task_id=43), AsyncMock(), AsyncMock())
+
+    content = (Path(tmp_log_dir) / "task-43.log").read_bytes()
+    assert content == b"".join((line + "\n").encode() for line in ndjson_lines)
+
+
 async def test_worktree_failure_calls_on_complete_with_error(executor):
     on_complete = AsyncMock()
 
@@ -245,7 +276,7 @@ async def test_workflow_instructions_appended_to_prompt(executor):
     assert "git push origin main" in all_args
 
     # Branch and path values are interpolated
-    branch, worktree_path = executor._worktree_info(task)
+    branch, worktree_path = executor.get_task_worktree_info(task.id)
     assert f"Your current branch is: {branch}" in all_args
     assert f"The main repository is at: {executor.base_repo}" in all_args
 
@@ -278,6 +309,47 @@ async def test_non_json_output_streams_raw_text(executor):
     assert complete_kwargs["exit_code"] == 0
 
 
+async def test_non_json_invalid_utf8_is_replaced(executor):
+    """Undecodable bytes in a plain-text line don't abort the stream."""
+    fake_proc = FakeProcess(stdout_lines=[], returncode=0)
+    fake_proc.stdout = asyncio.StreamReader()
+    fake_proc.stdout.feed_data("café ".encode() + b"\xff\n")
+    fake_proc.stdout.feed_eof()
+    output_calls = []
+
+    async def on_output(task_id, text):
+        output_calls.append(text)
+
+    with patch("backend.executor.create_worktree", new_callable=AsyncMock), \
+         patch("asyncio.create_subprocess_exec", return_value=fake_proc), \
+         patch("backend.executor.shutil.which", return_value="/usr/bin/claude"):
+        await executor.execute_task(make_task(), on_output, AsyncMock())
+
+    assert output_calls == ["café \ufffd"]
+
+
+async def test_unhandled_event_types_skip_json_parsing(executor):
+    """Compact events of types we ignore are dropped without orjson.loads."""
+    user_event = '{"type":"user","message":{"content":[{"type":"tool_result"}]}}'
+    ndjson_lines = [user_event, make_assistant_event("hi"), make_result_event(result="done")]
+    fake_proc = FakeProcess(stdout_lines=ndjson_lines, returncode=0)
+    output_calls = []
+
+    async def on_output(task_id, text):
+        output_calls.append(text)
+
+    with patch("backend.executor.create_worktree", new_callable=AsyncMock), \
+         patch("asyncio.create_subprocess_exec", return_value=fake_proc), \
+         patch("backend.executor.shutil.which", return_value="/usr/bin/claude"), \
+         patch("backend.executor.orjson.loads", wraps=orjson.loads) as mock_loads:
+        await executor.execute_task(make_task(), on_output, AsyncMock())
+
+    parsed = [c.args[0] for c in mock_loads.call_args_list]
+    assert user_event.encode() not in parsed
+    assert len(parsed) == 2
+    assert output_calls == ["hi"]
+
+
 async def test_plan_section_extracted_with_delimiter(executor):
     """Backward compat: ---PLAN END--- delimiter still works in execute mode."""
     result_with_plan = "Here is my plan\n---PLAN END---\nHere is the implementation"
@@ -375,19 +447,245 @@ async def test_tool_use_events_stream_summaries(executor):
     assert any("Reading: /README.md" in c for c in output_calls)
 
 
+async def test_assistant_event_blocks_coalesced_into_one_output(executor):
+    """All blocks of one assistant event reach on_output in a single call."""
+    event = json.dumps({
+        "type": "assistant",
+        "message": {"content": [
+            {"type": "text", "text": "Let me check."},
+            {"type": "tool_use", "name": "Bash", "input": {"command": "ls"}},
+            {"type": "text", "text": "Done."},
+        ]},
+    })
+    fake_proc = FakeProcess(stdout_lines=[event, make_result_event()], returncode=0)
+    output_calls = []
+
+    async def on_output(task_id, text):
+        output_calls.append(text)
+
+    with patch("backend.executor.create_worktree", new_callable=AsyncMock), \
+         patch("asyncio.create_subprocess_exec", return_value=fake_proc), \
+         patch("backend.executor.shutil.which", return_value="/usr/bin/claude"):
+        await executor.execute_task(make_task(), on_output, AsyncMock())
+
+    assert output_calls == ["Let me check.\n[Running: ls]\nDone."]
+
+
+async def test_execute_task_bounded_by_max_workers(tmp_path):
+    """No more than max_workers tasks are past the semaphore at once."""
+    executor = ClaudeCodeExecutor(
+        max_workers=1,
+        base_repo=str(tmp_path),
+        log_dir=str(tmp_path / "logs"),
+        worktree_dir=str(tmp_path / "wt"),
+    )
+    running = 0
+    peak = 0
+
+    async def slow_worktree(*args):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        raise WorktreeError("stop here")
+
+    with patch("backend.executor.create_worktree", side_effect=slow_worktree):
+        await asyncio.gather(
+            executor.execute_task(make_task(task_id=1), AsyncMock(), AsyncMock()),
+            executor.execute_task(make_task(task_id=2), AsyncMock(), AsyncMock()),
+        )
+
+    assert peak == 1
+
+
+async def test_execute_task_claims_spare_worktree(tmp_path):
+    """With a warm pool, the task claims a spare and the pool is refilled."""
+    executor = ClaudeCodeExecutor(
+        base_repo=str(tmp_path),
+        log_dir=str(tmp_path / "logs"),
+        worktree_dir=str(tmp_path / "wt"),
+        worktree_pool_size=1,
+    )
+    fake_proc = FakeProcess(stdout_lines=[make_result_event()], returncode=0)
+
+    with patch("backend.executor.create_detached_worktree", new_callable=AsyncMock) as mock_spare, \
+         patch("backend.executor.claim_worktree", new_callable=AsyncMock) as mock_claim, \
+         patch("backend.executor.create_worktree", new_callable=AsyncMock) as mock_create, \
+         patch("asyncio.create_subprocess_exec", return_value=fake_proc), \
+         patch("backend.executor.shutil.which", return_value="/usr/bin/claude"):
+        await executor.fill_worktree_pool()
+        spare = executor._spare_worktrees[0]
+        await executor.execute_task(make_task(), AsyncMock(), AsyncMock())
+        await asyncio.gather(*executor._pool_refills)
+
+    branch, path = executor.get_task_worktree_info(1)
+    mock_claim.assert_awaited_once_with(str(tmp_path), spare, branch, path)
+    mock_create.assert_not_called()
+    assert mock_spare.await_count == 2
+    assert len(executor._spare_worktrees) == 1
+
+
+async def test_claude_path_resolved_once(tmp_path):
+    """The claude binary is looked up at construction, not on every task."""
+    with patch("backend.executor.shutil.which", return_value="/opt/claude") as mock_which:
+        executor = ClaudeCodeExecutor(
+            base_repo="/fake/repo",
+            log_dir=str(tmp_path / "logs"),
+            worktree_dir=str(tmp_path / "wt"),
+        )
+        for task_id in (1, 2):
+            fake_proc = FakeProcess(stdout_lines=[make_result_event()], returncode=0)
+            with patch("backend.executor.create_worktree", new_callable=AsyncMock), \
+                 patch("asyncio.create_subprocess_exec", return_value=fake_proc) as mock_exec:
+                await executor.execute_task(make_task(task_id=task_id), AsyncMock(), AsyncMock())
+            assert mock_exec.call_args.args[0] == "/opt/claude"
+
+    assert mock_which.call_count == 1
+
+
+async def test_missing_claude_fails_task(tmp_path):
+    """If claude is not on PATH the task completes with an error."""
+    with patch("backend.executor.shutil.which", return_value=None):
+        executor = ClaudeCodeExecutor(
+            base_repo="/fake/repo",
+            log_dir=str(tmp_path / "logs"),
+            worktree_dir=str(tmp_path / "wt"),
+        )
+        on_complete = AsyncMock()
+        with patch("backend.executor.create_worktree", new_callable=AsyncMock), \
+             patch("backend.executor.remove_worktree", new_callable=AsyncMock), \
+             patch("backend.executor.cleanup_branch", new_callable=AsyncMock):
+            await executor.execute_task(make_task(), AsyncMock(), on_complete)
+
+    assert on_complete.call_args.kwargs["exit_code"] == 1
+    assert "claude CLI not found" in on_complete.call_args.kwargs["error"]
+
+
+async def test_subprocess_started_in_own_session_and_deprioritized(executor, no_deprioritize):
+    """claude runs in a new session and is reniced right after spawn."""
+    fake_proc = FakeProcess(stdout_lines=[make_result_event()], returncode=0)
+
+    with patch("backend.executor.create_worktree", new_callable=AsyncMock), \
+         patch("asyncio.create_subprocess_exec", return_value=fake_proc) as mock_exec, \
+         patch("backend.executor.shutil.which", return_value="/usr/bin/claude"):
+        await executor.execute_task(make_task(), AsyncMock(), AsyncMock())
+
+    assert mock_exec.call_args.kwargs["start_new_session"] is True
+    no_deprioritize.assert_called_once_with(fake_proc.pid)
+
+
+async def test_deprioritize_renices_process():
+    """_deprioritize applies WORKER_NICE to a real child process."""
+    proc = await asyncio.create_subprocess_exec("sleep", "5")
+    try:
+        _deprioritize(proc.pid)
+        assert os.getpriority(os.PRIO_PROCESS, proc.pid) >= WORKER_NICE
+    finally:
+        proc.kill()
+        await proc.wait()
+
+
+def group_gone_after_sigterm(pgid, sig):
+    """os.killpg stand-in for a group that exits on SIGTERM."""
+    if sig == signal.SIGKILL:
+        raise ProcessLookupError
+
+
 async def test_cancel_task_terminates_process(executor):
     task = make_task(task_id=99)
     mock_proc = MagicMock()
+    mock_proc.pid = 4321
+    mock_proc.wait = AsyncMock(return_value=-15)
     executor.active_tasks[99] = mock_proc
 
-    with patch("backend.executor.remove_worktree", new_callable=AsyncMock), \
+    with patch("backend.executor.os.killpg", side_effect=group_gone_after_sigterm) as killpg, \
+         patch("backend.executor.remove_worktree", new_callable=AsyncMock), \
          patch("backend.executor.cleanup_branch", new_callable=AsyncMock):
         await executor.cancel_task(99)
 
-    mock_proc.terminate.assert_called_once()
+    assert killpg.call_args_list[0].args == (4321, signal.SIGTERM)
+    mock_proc.wait.assert_awaited()
     assert 99 not in executor.active_tasks
 
 
+async def test_cancel_task_kills_process_that_ignores_sigterm(executor):
+    exited = asyncio.Event()
+    mock_proc = MagicMock()
+    mock_proc.pid = 4321
+
+    def killpg(pgid, sig):
+        if sig == signal.SIGKILL:
+            exited.set()
+
+    async def wait():
+        await exited.wait()
+        return -9
+
+    mock_proc.wait = wait
+    executor.active_tasks[99] = mock_proc
+
+    with patch("backend.executor.KILL_TIMEOUT", 0.01), \
+         patch("backend.executor.os.killpg", side_effect=killpg) as mock_killpg, \
+         patch("backend.executor.remove_worktree", new_callable=AsyncMock), \
+         patch("backend.executor.cleanup_branch", new_callable=AsyncMock):
+        await executor.cancel_task(99)
+
+    assert [c.args for c in mock_killpg.call_args_list] == [
+        (4321, signal.SIGTERM), (4321, signal.SIGKILL),
+    ]
+
+
+async def test_terminate_kills_whole_process_group(executor):
+    """Tools claude started are stopped along with it."""
+    proc = await asyncio.create_subprocess_exec(
+        "sh", "-c", "sleep 30 & echo $!; wait",
+        stdout=asyncio.subprocess.PIPE,
+        start_new_session=True,
+    )
+    child_pid = int(await proc.stdout.readline())
+
+    await executor._terminate(proc)
+
+    # The orphaned sleep is reparented to init, which may not reap it at
+    # once, so a zombie counts as stopped
+    stat = Path(f"/proc/{child_pid}/stat")
+    for _ in range(100):
+        try:
+            if stat.read_text().rsplit(")", 1)[1].split()[0] == "Z":
+                break
+        except FileNotFoundError:
+            break
+        await asyncio.sleep(0.01)
+    else:
+        pytest.fail("child of the terminated process is still running")
+
+
+async def test_shutdown_stops_running_task_without_completing(executor):
+    """Shutdown kills claude and leaves the task for startup recovery."""
+    fake_proc = FakeProcess(stdout_lines=[], returncode=-15)
+    fake_proc.stdout = asyncio.StreamReader()
+
+    def stop(pgid, sig):
+        fake_proc.stdout.feed_eof()
+
+    on_complete = AsyncMock()
+    with patch("backend.executor.create_worktree", new_callable=AsyncMock), \
+         patch("backend.executor.shutil.which", return_value="/usr/bin/claude"), \
+         patch("backend.executor.os.killpg", side_effect=stop) as mock_killpg, \
+         patch("asyncio.create_subprocess_exec", return_value=fake_proc):
+        running = asyncio.create_task(
+            executor.execute_task(make_task(task_id=3), AsyncMock(), on_complete)
+        )
+        await asyncio.sleep(0.01)
+        await executor.shutdown()
+        await running
+
+    assert mock_killpg.call_args_list[0].args == (fake_proc.pid, signal.SIGTERM)
+    on_complete.assert_not_awaited()
+    assert not executor.active_tasks
+
+
 async def test_cancel_task_noop_for_unknown_id(executor):
     with patch("backend.executor.remove_worktree", new_callable=AsyncMock), \
          patch("backend.executor.cleanup_branch", new_callable=AsyncMock):
@@ -421,14 +719,17 @@ async def test_cancel_cleans_up_worktree(executor):
     """When a task is cancelled, its worktree should be cleaned up."""
     task = make_task(task_id=5)
     mock_proc = MagicMock()
+    mock_proc.pid = 4321
+    mock_proc.wait = AsyncMock(return_value=-15)
     executor.active_tasks[5] = mock_proc
     executor._task_worktrees[5] = ("task-5-branch", "/fake/wt")
 
-    with patch("backend.executor.remove_worktree", new_callable=AsyncMock) as mock_remove_wt, \
+    with patch("backend.executor.os.killpg", side_effect=group_gone_after_sigterm) as killpg, \
+         patch("backend.executor.remove_worktree", new_callable=AsyncMock) as mock_remove_wt, \
          patch("backend.executor.cleanup_branch", new_callable=AsyncMock) as mock_cleanup_br:
         await executor.cancel_task(5)
 
-    mock_proc.terminate.assert_called_once()
+    killpg.assert_any_call(4321, signal.SIGTERM)
     mock_remove_wt.assert_called_once_with("/fake/repo", "/fake/wt")
     mock_cleanup_br.assert_called_once_with("/fake/repo", "task-5-branch")
 
@@ -438,3 +739,112 @@ async def test_get_task_worktree_info(executor):
     info = executor.get_task_worktree_info(10)
     assert info == ("branch-10", "/path/to/wt")
     assert executor.get_task_worktree_info(999) is None
+
+
+async def test_rerun_reuses_registered_worktree(executor):
+    """A retried task keeps its registered branch/path even if renamed."""
+    fake_proc = FakeProcess(stdout_lines=[make_result_event()], returncode=0)
+    executor._task_worktrees[7] = ("task-7-Old-title", "/fake/wt/task-7-Old-title")
+
+    with patch("backend.executor.create_worktree", new_callable=AsyncMock) as mock_create_wt, \
+         patch("asyncio.create_subprocess_exec", return_value=fake_proc), \
+         patch("backend.executor.shutil.which", return_value="/usr/bin/claude"):
+        await executor.execute_task(make_task(task_id=7, title="New title"), AsyncMock(), AsyncMock())
+
+    mock_create_wt.assert_awaited_once_with(
+        "/fake/repo", "task-7-Old-title", "/fake/wt/task-7-Old-title",
+    )
+
+
+async def test_stderr_keeps_only_tail(executor):
+    """Huge stderr output is truncated to the last STDERR_TAIL_BYTES."""
+    from backend.executor import STDERR_TAIL_BYTES
+    stderr = "x" * (STDERR_TAIL_BYTES * 3) + "END"
+    fake_proc = FakeProcess(stdout_lines=[], returncode=1, stderr=stderr)
+    complete_kwargs = {}
+
+    async def on_output(task_id, text):
+        pass
+
+    async def on_complete(task_id, **kwargs):
+        complete_kwargs.update(kwargs)
+
+    with patch("backend.executor.create_worktree", new_callable=AsyncMock), \
+         patch("backend.executor.remove_worktree", new_callable=AsyncMock), \
+         patch("backend.executor.cleanup_branch", new_callable=AsyncMock), \
+         patch("backend.executor.shutil.which", return_value="/usr/bin/claude"), \
+         patch("asyncio.create_subprocess_exec", return_value=fake_proc):
+        await executor.execute_task(make_task(), on_output, on_complete)
+
+    assert len(complete_kwargs["error"]) == STDERR_TAIL_BYTES
+    assert complete_kwargs["error"].endswith("END")
+
+
+async def test_line_over_stream_limit_is_parsed(executor):
+    """An NDJSON event longer than the StreamReader limit is reassembled."""
+    big_text = "y" * 200_000
+    ndjson_lines = [
+        make_system_event(),
+        make_assistant_event(big_text),
+        make_assistant_event("after"),
+        make_result_event(result="done"),
+    ]
+    fake_proc = FakeProcess(stdout_lines=ndjson_lines, returncode=0)
+    output_calls = []
+
+    async def on_output(task_id, text):
+        output_calls.append(text)
+
+    with patch("backend.executor.create_worktree", new_callable=AsyncMock), \
+         patch("backend.executor.shutil.which", return_value="/usr/bin/claude"), \
+         patch("asyncio.create_subprocess_exec", return_value=fake_proc):
+        await executor.execute_task(make_task(), on_output, AsyncMock())
+
+    assert big_text in output_calls
+    assert output_calls[-1] == "after"
+
+
+async def test_read_line_reassembles_lines_over_limit():
+    """read_line() returns lines longer than the reader's limit whole."""
+    reader = asyncio.StreamReader(limit=16)
+    reader.feed_data(b"short\n" + b"z" * 100 + b"\ntail")
+    reader.feed_eof()
+
+    assert await read_line(reader) == b"short\n"
+    assert await read_line(reader) == b"z" * 100 + b"\n"
+    assert await read_line(reader) == b"tail"
+    assert await read_line(reader) == b""
+
+
+async def test_cancel_task_while_waiting_for_slot(tmp_path):
+    """A task cancelled before it gets a slot never runs or completes."""
+    executor = ClaudeCodeExecutor(
+        max_workers=1,
+        base_repo=str(tmp_path),
+        log_dir=str(tmp_path / "logs"),
+        worktree_dir=str(tmp_path / "wt"),
+    )
+    release = asyncio.Event()
+    started = []
+
+    async def blocking_worktree(base_repo, branch, path):
+        started.append(branch)
+        await release.wait()
+        raise WorktreeError("stop here")
+
+    on_complete_2 = AsyncMock()
+    with patch("backend.executor.create_worktree", side_effect=blocking_worktree):
+        first = asyncio.create_task(
+            executor.execute_task(make_task(task_id=1), AsyncMock(), AsyncMock())
+        )
+        second = asyncio.create_task(
+            executor.execute_task(make_task(task_id=2), AsyncMock(), on_complete_2)
+        )
+        await asyncio.sleep(0.01)
+        await executor.cancel_task(2)
+        release.set()
+        await asyncio.gather(first, second)
+
+    assert len(started) == 1
+    on_complete_2.assert_not_awaited()
+    assert not executor._queued_tasks
@@ -54,6 +54,7 @@ def make_scheduler(db=None, max_concurrent=3):
         db.get_task = AsyncMock(return_value=None)
         db.update_task = AsyncMock()
         db.add_log = AsyncMock()
+        db.add_logs_bulk = AsyncMock()
         db.list_tasks = AsyncMock(return_value=[])
     scheduler = TaskScheduler(executor=executor, db=db, ws_manager=ws, max_concurrent=max_concurrent)
     return scheduler, executor, ws
@@ -137,13 +138,71 @@ async def test_concurrent_limit():
     scheduler.db.update_task.assert_not_called()
 
 
+async def test_active_slots_tracked_in_memory():
+    """Dispatch fills slots; completion and cancel free them, without counting rows."""
+    scheduler, executor, ws = make_scheduler(max_concurrent=2)
+    executor.execute_task.side_effect = lambda *a: asyncio.Event().wait()
+
+    await scheduler._dispatch(make_task(1))
+    await scheduler._dispatch(make_task(2))
+    assert scheduler._active == {1, 2}
+
+    await scheduler._dispatch_pending()
+    scheduler.db.get_next_pending_task.assert_not_called()
+    scheduler.db.count_tasks.assert_not_called()
+
+    await scheduler._on_complete(1, exit_code=0, output="done")
+    await scheduler.cancel_task(2)
+    assert scheduler._active == set()
+    await scheduler.shutdown()
+
+
 # ── _on_output broadcasts and logs ────────────────────────────────────────────
 
 async def test_on_output_broadcasts_and_logs():
     scheduler, executor, ws = make_scheduler()
     await scheduler._on_output(task_id=5, chunk="hello output")
-    scheduler.db.add_log.assert_called_once_with(5, "info", "hello output", raw_output="hello output")
-    ws.broadcast.assert_called_once_with(5, {"type": "output", "data": "hello output"})
+    # Output is buffered until the flush interval, batch size, or completion
+    ws.broadcast.assert_not_called()
+    await scheduler._flush_output(5)
+    scheduler.db.add_logs_bulk.assert_called_once_with(
+        [(5, "info", "hello output", "hello output")]
+    )
+    ws.broadcast.assert_called_once_with(5, {"type": "output", "lines": ["hello output"]})
+
+
+async def test_on_output_flushes_at_batch_size():
+    from backend.scheduler import OUTPUT_FLUSH_LINES
+    scheduler, executor, ws = make_scheduler()
+    for i in range(OUTPUT_FLUSH_LINES):
+        await scheduler._on_output(task_id=5, chunk=f"line {i}")
+    scheduler.db.add_logs_bulk.assert_called_once()
+    rows = scheduler.db.add_logs_bulk.call_args.args[0]
+    assert [r[2] for r in rows] == [f"line {i}" for i in range(OUTPUT_FLUSH_LINES)]
+    ws.broadcast.assert_called_once_with(
+        5, {"type": "output", "lines": [f"line {i}" for i in range(OUTPUT_FLUSH_LINES)]}
+    )
+
+
+async def test_on_output_flushes_after_interval():
+    from backend.scheduler import OUTPUT_FLUSH_INTERVAL
+    scheduler, executor, ws = make_scheduler()
+    await scheduler._on_output(task_id=5, chunk="a")
+    await scheduler._on_output(task_id=5, chunk="b")
+    await asyncio.sleep(OUTPUT_FLUSH_INTERVAL * 2)
+    ws.broadcast.assert_called_once_with(5, {"type": "output", "lines": ["a", "b"]})
+
+
+async def test_on_complete_flushes_buffered_output():
+    scheduler, executor, ws = make_scheduler()
+    await scheduler._on_output(task_id=5, chunk="last line")
+    await scheduler._on_complete(task_id=5, exit_code=0, output="done")
+    scheduler.db.add_logs_bulk.assert_called_once_with(
+        [(5, "info", "last line", "last line")]
+    )
+    # Buffered output goes out before the completion event
+    assert ws.broadcast.call_args_list[0].args[1] == {"type": "output", "lines": ["last line"]}
+    assert ws.broadcast.call_args_list[1].args[1]["type"] == "complete"
 
 
 # ── _on_complete marks completed ──────────────────────────────────────────────
@@ -201,3 +260,67 @@ async def test_cancel_task():
     scheduler, executor, ws = make_scheduler()
     await scheduler.cancel_task(42)
     executor.cancel_task.assert_called_once_with(42)
+
+
+async def test_shutdown_cancels_inflight_executor_runs():
+    """Runs still in flight at shutdown are cancelled and awaited."""
+    scheduler, executor, ws = make_scheduler()
+    started = asyncio.Event()
+
+    async def hang(task, on_output, on_complete):
+        started.set()
+        await asyncio.Event().wait()
+
+    executor.execute_task.side_effect = hang
+    await scheduler._dispatch(make_task(task_id=7))
+    await started.wait()
+    (run,) = scheduler._inflight
+
+    await scheduler.shutdown()
+
+    assert run.cancelled()
+    assert not scheduler._inflight
+
+
+# ── Event-driven wake-up ──────────────────────────────────────────────────────
+
+async def test_wake_triggers_dispatch_without_waiting_for_poll():
+    """wake() runs a dispatch pass immediately instead of after poll_interval."""
+    scheduler, executor, ws = make_scheduler()
+    assert scheduler.poll_interval >= 10
+    loop_task = asyncio.create_task(scheduler.start())
+    await asyncio.sleep(0.01)
+    assert scheduler.db.get_next_pending_task.await_count == 1
+
+    scheduler.wake()
+    await asyncio.sleep(0.01)
+    assert scheduler.db.get_next_pending_task.await_count == 2
+
+    scheduler.stop()
+    await asyncio.wait_for(loop_task, timeout=1)
+
+
+async def test_on_complete_wakes_scheduler():
+    scheduler, executor, ws = make_scheduler()
+    await scheduler._on_complete(1, exit_code=0, output="done")
+    assert scheduler._wake.is_set()
+
+
+async def test_dispatch_skips_blocked_task_and_fills_all_slots(real_db):
+    """A blocked high-priority task doesn't hold back ready ones behind it."""
+    parent = await real_db.create_task(title="parent", prompt="p", priority="low")
+    await real_db.update_task(parent.id, status=TaskStatus.FAILED)
+    blocked = await real_db.create_task(
+        title="blocked", prompt="p", priority="urgent", depends_on=[parent.id]
+    )
+    ready = [
+        await real_db.create_task(title=f"ready-{i}", prompt="p", priority="medium")
+        for i in range(3)
+    ]
+    scheduler, executor, ws = make_scheduler(db=real_db, max_concurrent=2)
+
+    await scheduler._dispatch_pending()
+
+    dispatched = [c.args[0].id for c in executor.execute_task.call_args_list]
+    assert dispatched == [ready[0].id, ready[1].id]
+    assert (await real_db.get_task(blocked.id)).status == TaskStatus.PENDING
@@ -5,6 +5,7 @@ import tempfile
 
 import pytest
 import pytest_asyncio
+from unittest.mock import patch
 
 from backend.database import Database
 from backend.models import Task, TaskStatus, TaskMode, TaskPriority
@@ -280,6 +281,72 @@ async def test_concurrent_syncs_safe(tmp_registry, db):
     assert len(output["tasks"]) == 5
 
 
+async def test_update_upserts_and_removes(tmp_registry, db):
+    """update() changes only the given tasks and keeps the rest from the last sync."""
+    reg = TaskRegistry(tmp_registry)
+    reg.load_cli_tasks()
+    t1 = await db.create_task(title="One", prompt="P1")
+    t2 = await db.create_task(title="Two", prompt="P2")
+    await reg.sync(await db.list_tasks())
+
+    await db.update_task(t1.id, status=TaskStatus.COMPLETED, cost_usd=0.5)
+    t3 = await db.create_task(title="Three", prompt="P3")
+    await reg.update([await db.get_task(t1.id), t3], removed_ids=[t2.id])
+    await reg.flush()
+
+    with open(tmp_registry) as f:
+        output = json.load(f)
+
+    assert [t["id"] for t in output["tasks"]] == [f"web-{t1.id}", f"web-{t3.id}"]
+    assert output["tasks"][0]["status"] == "completed"
+    assert output["meta"]["web_tasks"] == 2
+    assert output["meta"]["total_cost_usd"] == 0.5
+
+
+async def test_update_burst_coalesces_into_one_write(tmp_registry, db):
+    """Updates made within WRITE_DELAY are written together, once."""
+    reg = TaskRegistry(tmp_registry)
+    reg.load_cli_tasks()
+    await reg.sync([])
+    tasks = [await db.create_task(title=f"T{i}", prompt="P") for i in range(5)]
+
+    with patch.object(reg, "_atomic_write", wraps=reg._atomic_write) as write:
+        for t in tasks:
+            await reg.update([t])
+        await reg.flush()
+
+    write.assert_called_once()
+    with open(tmp_registry) as f:
+        assert json.load(f)["meta"]["web_tasks"] == 5
+
+
+async def test_update_with_unchanged_tasks_skips_write(tmp_registry, db):
+    """Re-syncing tasks whose registry entries are unchanged writes nothing."""
+    reg = TaskRegistry(tmp_registry)
+    reg.load_cli_tasks()
+    task = await db.create_task(title="Same", prompt="P")
+    await reg.sync(await db.list_tasks())
+
+    with patch.object(reg, "_atomic_write") as write:
+        await reg.update([await db.get_task(task.id)], removed_ids=[12345])
+        await reg.flush()
+
+    write.assert_not_called()
+
+
+async def test_update_write_error_is_logged_not_raised(tmp_registry, db, capsys):
+    """A failed background write is logged, and flush() still returns."""
+    reg = TaskRegistry(tmp_registry)
+    reg.load_cli_tasks()
+    task = await db.create_task(title="T", prompt="P")
+
+    with patch.object(reg, "_atomic_write", side_effect=OSError("disk full")):
+        await reg.update([task])
+        await reg.flush()
+
+    assert "[registry] sync error: disk full" in capsys.readouterr().out
+
+
 async def test_sync_creates_parent_dir(tmp_path):
     """Sync creates parent directories if they don't exist."""
     path = str(tmp_path / "subdir" / "nested" / "dev-tasks.json")
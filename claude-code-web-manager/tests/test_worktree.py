@@ -1,11 +1,14 @@
 import asyncio
 import os
+import shutil
 import tempfile
 from pathlib import Path
 from unittest.mock import AsyncMock, patch, MagicMock
 import pytest
 
 from backend.worktree import (
+    claim_worktree,
+    create_detached_worktree,
     create_worktree,
     remove_worktree,
     merge_worktree,
@@ -26,6 +29,16 @@ def make_git_result(stdout: str = "", stderr: str = "", returncode: int = 0):
     return _mock
 
 
+def make_git_proc(stdout: str, returncode: int = 0):
+    """Create a mock git process whose stdout is a real StreamReader."""
+    proc = MagicMock()
+    proc.stdout = asyncio.StreamReader()
+    proc.stdout.feed_data(stdout.encode())
+    proc.stdout.feed_eof()
+    proc.wait = AsyncMock(return_value=returncode)
+    return proc
+
+
 # ── Tests with mocked git ────────────────────────────────────────────────────
 
 
@@ -110,6 +123,53 @@ async def test_cleanup_branch():
     mock.assert_called_once_with("branch", "-D", "task-1-test", cwd="/fake/repo")
 
 
+async def test_run_git_uses_dash_c_and_serializes_worktree_admin():
+    """git runs via -C; concurrent `worktree add`s on one repo don't overlap."""
+    running = 0
+    peak = 0
+
+    async def fake_exec(*cmd, **kwargs):
+        nonlocal running, peak
+        assert cmd[:3] == ("git", "-C", "/fake/repo")
+        assert "cwd" not in kwargs
+        running += 1
+        peak = max(peak, running)
+
+        async def communicate():
+            nonlocal running
+            await asyncio.sleep(0.01)
+            running -= 1
+            return b"", b""
+
+        proc = MagicMock()
+        proc.communicate = communicate
+        proc.returncode = 0
+        return proc
+
+    with patch("asyncio.create_subprocess_exec", side_effect=fake_exec):
+        await asyncio.gather(
+            *(_run_git("worktree", "add", f"/wt/{i}", cwd="/fake/repo") for i in range(3))
+        )
+        assert peak == 1
+        peak = 0
+        await asyncio.gather(*(_run_git("status", cwd="/fake/repo") for _ in range(3)))
+        assert peak == 3
+
+
+async def test_remove_worktree_fallback_deletes_off_loop(tmp_path):
+    """When git can't remove it, the directory is deleted on a worker thread."""
+    wt = tmp_path / "wt"
+    (wt / "pkg").mkdir(parents=True)
+    (wt / "pkg" / "mod.py").write_text("x = 1")
+
+    with patch("backend.worktree._run_git", return_value=("", "not a worktree", 1)), \
+         patch("backend.worktree.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+        await remove_worktree("/fake/repo", str(wt))
+
+    assert to_thread.call_args.args[0] is shutil.rmtree
+    assert not wt.exists()
+
+
 async def test_list_worktrees():
     porcelain_output = (
         "worktree /fake/repo\n"
@@ -124,8 +184,7 @@ async def test_list_worktrees():
         "HEAD 789abc\n"
         "branch refs/heads/task-2\n"
     )
-    with patch("backend.worktree._run_git") as mock:
-        mock.return_value = (porcelain_output, "", 0)
+    with patch("asyncio.create_subprocess_exec", return_value=make_git_proc(porcelain_output)):
         paths = await list_worktrees("/fake/repo")
     assert paths == [
         "/home/ubuntu/worktrees/task-1",
@@ -134,8 +193,7 @@ async def test_list_worktrees():
 
 
 async def test_list_worktrees_empty_on_error():
-    with patch("backend.worktree._run_git") as mock:
-        mock.return_value = ("", "not a git repository", 128)
+    with patch("asyncio.create_subprocess_exec", return_value=make_git_proc("", 128)):
         paths = await list_worktrees("/fake/repo")
     assert paths == []
 
@@ -246,3 +304,70 @@ async def test_integration_merge_worktree(git_repo, tmp_path):
     # Clean up
     await remove_worktree(str(git_repo), wt_path)
     await cleanup_branch(str(git_repo), branch)
+
+
+async def test_integration_claim_spare_worktree(git_repo, tmp_path):
+    """A spare made at an old HEAD is claimed onto a branch at the new HEAD."""
+    import subprocess
+
+    spare = str(tmp_path / "pool" / "spare-1")
+    await create_detached_worktree(str(git_repo), spare)
+
+    # Base repo moves on after the spare was created
+    (git_repo / "later.txt").write_text("added after spare")
+    subprocess.run(["git", "add", "."], cwd=str(git_repo), check=True, capture_output=True)
+    subprocess.run(
+        ["git", "commit", "-m", "later"],
+        cwd=str(git_repo), check=True, capture_output=True,
+    )
+
+    wt_path = str(tmp_path / "task-1-claimed")
+    result = await claim_worktree(str(git_repo), spare, "task-1-claimed", wt_path)
+
+    assert result == wt_path
+    assert not Path(spare).exists()
+    assert (Path(wt_path) / "later.txt").read_text() == "added after spare"
+    branch = subprocess.run(
+        ["git", "branch", "--show-current"],
+        cwd=wt_path, check=True, capture_output=True, text=True,
+    ).stdout.strip()
+    assert branch == "task-1-claimed"
+
+    await remove_worktree(str(git_repo), wt_path)
+
+
+async def test_claim_worktree_existing_branch_removes_worktree(git_repo, tmp_path):
+    """If the branch already exists the claimed worktree is removed and it raises."""
+    import subprocess
+
+    subprocess.run(
+        ["git", "branch", "taken"], cwd=str(git_repo), check=True, capture_output=True,
+    )
+    spare = str(tmp_path / "pool" / "spare-1")
+    await create_detached_worktree(str(git_repo), spare)
+
+    wt_path = str(tmp_path / "taken")
+    with pytest.raises(WorktreeError, match="branch creation failed"):
+        await claim_worktree(str(git_repo), spare, "taken", wt_path)
+    assert not Path(wt_path).exists()
+
+
+async def test_claim_worktree_move_failure_removes_spare(git_repo, tmp_path):
+    """If the target path is taken the spare is removed rather than leaked."""
+    import subprocess
+
+    spare = str(tmp_path / "pool" / "spare-1")
+    await create_detached_worktree(str(git_repo), spare)
+    wt_path = tmp_path / "task-1-leftover"
+    wt_path.mkdir()
+    (wt_path / "plan.md").write_text("left behind")
+
+    with pytest.raises(WorktreeError, match="worktree move failed"):
+        await claim_worktree(str(git_repo), spare, "task-1-leftover", str(wt_path))
+
+    assert not Path(spare).exists()
+    listed = subprocess.run(
+        ["git", "worktree", "list", "--porcelain"],
+        cwd=str(git_repo), check=True, capture_output=True, text=True,
+    ).stdout
+    assert spare not in listed